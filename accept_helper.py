@@ -0,0 +1,141 @@
+import json
+
+JOB_CARD_SELECTOR = "div[class*='--bg-white'][class*='--rounded-lg'][class*='--flex-col']"
+ACCEPT_BUTTON_SELECTOR = "div[is='e-tracing'][tracing-name='user_available_accept'][class*='--rounded-lg'][class*='--text-white']"
+CONFIRM_BUTTON_SELECTOR = "div[class='--w-full --h-full --absolute --top-0 --left-0']"
+VEHICLE_TYPE_SELECTOR = "div[class*='--text-sm'][class*='--font-bold']"
+LOCATION_SELECTOR = "div[class*='--line-clamp-1'][class*='--text-sm']"
+
+# cardMatches(card, expected) is true if a job card still shows the ride that was
+# scored (same vehicle type and pickup text). Cards shift position when a ride is
+# taken or expires, so an index alone can point at a ride that was never checked.
+CARD_MATCHES_JS = """
+  function normalise(text) { return (text || '').replace(/\\s+/g, ' ').trim(); }
+  function cardMatches(card, expected) {
+    if (!card || !expected) return false;
+    var vehicle = card.querySelector(%(vehicle)s);
+    var pickup = card.querySelector(%(location)s);
+    return !!vehicle && !!pickup &&
+      normalise(vehicle.textContent) === normalise(expected.vehicleType) &&
+      normalise(pickup.textContent) === normalise(expected.pickupLocation);
+  }
+"""
+
+# In-page helper for the pre-armed accept path.
+#
+# window.__fleetArm() caches a live reference to each card and its accept control
+# (index-aligned with the job card list) and is called once per poll, before
+# rides are scored. window.__fleetAccept(index, timeoutMs, fallback, expected)
+# clicks the armed control if its card is still attached and still matches the
+# expected ride, else the fallback control of the scored card, then clicks
+# confirm as soon as the overlay mounts (watched with a MutationObserver), so
+# the whole accept happens within one call from Python. It resolves to
+# {confirmed, elapsedMs, error}.
+ACCEPT_HELPER_JS = """
+(function () {
+  if (window.__fleetAccept) return;
+  var CARD = %(card)s, ACCEPT = %(accept)s, CONFIRM = %(confirm)s;
+  var armed = [];
+%(card_matches)s
+  window.__fleetArm = function () {
+    armed = Array.prototype.map.call(document.querySelectorAll(CARD), function (card) {
+      return {card: card, button: card.querySelector(ACCEPT)};
+    });
+    return armed.filter(function (entry) { return entry.button; }).length;
+  };
+
+  function clickConfirm(timeoutMs) {
+    return new Promise(function (resolve) {
+      function tryClick() {
+        var el = document.querySelector(CONFIRM);
+        if (!el) return false;
+        el.click();
+        return true;
+      }
+      if (tryClick()) return resolve({confirmed: true});
+      var observer = new MutationObserver(function () {
+        if (tryClick()) {
+          observer.disconnect();
+          clearTimeout(timer);
+          resolve({confirmed: true});
+        }
+      });
+      observer.observe(document.documentElement, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ['class']
+      });
+      var timer = setTimeout(function () {
+        observer.disconnect();
+        resolve({confirmed: false, error: 'confirm overlay did not appear'});
+      }, timeoutMs);
+    });
+  }
+
+  window.__fleetAccept = function (index, timeoutMs, fallback, expected) {
+    var entry = armed[index];
+    var button = null;
+    if (entry && entry.button && entry.button.isConnected && cardMatches(entry.card, expected)) {
+      button = entry.button;
+    } else if (fallback && fallback.isConnected) {
+      button = fallback;
+    }
+    if (!button) {
+      return Promise.resolve({confirmed: false, error: 'accept control not found'});
+    }
+    var started = performance.now();
+    button.click();
+    return clickConfirm(timeoutMs).then(function (result) {
+      result.elapsedMs = performance.now() - started;
+      return result;
+    });
+  };
+})();
+"""
+
+
+# Viewport centre of the accept control of the index-th card, scrolled into view,
+# or null if that card no longer shows the expected ride
+CARD_ACCEPT_POINT_JS = """
+(function () {
+%(card_matches)s
+  var card = document.querySelectorAll(%(card)s)[%(index)d];
+  if (!cardMatches(card, %(expected)s)) return null;
+  var button = card.querySelector(%(accept)s);
+  if (!button) return null;
+  button.scrollIntoView({block: 'center', inline: 'center'});
+  var r = button.getBoundingClientRect();
+  return {x: r.left + r.width / 2, y: r.top + r.height / 2};
+})()
+"""
+
+
+def build_card_matches_js():
+    return CARD_MATCHES_JS % {
+        'vehicle': json.dumps(VEHICLE_TYPE_SELECTOR),
+        'location': json.dumps(LOCATION_SELECTOR),
+    }
+
+
+def expected_card(ride):
+    """Card texts a RideRecord was matched on, for cardMatches()"""
+    return {'vehicleType': ride.vehicle_type, 'pickupLocation': ride.pickup_location}
+
+
+def build_accept_helper_js():
+    """Return the helper script with the selectors filled in"""
+    return ACCEPT_HELPER_JS % {
+        'card': json.dumps(JOB_CARD_SELECTOR),
+        'accept': json.dumps(ACCEPT_BUTTON_SELECTOR),
+        'confirm': json.dumps(CONFIRM_BUTTON_SELECTOR),
+        'card_matches': build_card_matches_js(),
+    }
+
+
+def build_card_accept_point_js(card_index, ride):
+    """Return the expression locating the accept control of a card that still shows ride"""
+    return CARD_ACCEPT_POINT_JS % {
+        'card_matches': build_card_matches_js(),
+        'card': json.dumps(JOB_CARD_SELECTOR),
+        'index': int(card_index),
+        'expected': json.dumps(expected_card(ride)),
+        'accept': json.dumps(ACCEPT_BUTTON_SELECTOR),
+    }
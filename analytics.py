@@ -0,0 +1,427 @@
+"""Streaming analytics over job_history.csv and api_response_*.json archives.
+
+Sources are read chunk by chunk so memory stays bounded by the aggregates, not
+the archive size. Each file is processed in its own worker process and its
+partial aggregates are cached in --cache-dir, keyed by path, size and mtime.
+A re-run only processes new files; for the append-only history CSV it resumes
+from the byte offset reached last time.
+
+Usage:
+    python analytics.py [--history job_history.csv] [--responses "api_response_*.json"]
+                        [--workers 4] [--destinations Genting,Melaka] [--rides-out rides.csv]
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import os
+import re
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from rides import RideRecord
+
+CACHE_VERSION = 2
+FAILED_ACCEPT_REASON = 'Failed to accept job'
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+RESPONSE_NAME_RE = re.compile(r'api_response_(\d{8})_(\d{6})_\d+\.json$')
+PRICE_BUCKET_CENTS = 1000  # Price histogram bucket width (10.00 in the auction currency)
+
+
+class Aggregates:
+    """Mergeable partial aggregates for one source file (or the whole run).
+
+    Rides are counted once by ride_id, however many rows or response files
+    mention them, so the history CSV and the API archives can be combined:
+
+    - seen: destination -> hour -> set of ride_ids seen in that hour
+    - rides: ride_id -> [first_seen, last_seen, vehicle_type, amount_cents, currency];
+      timestamps are 'YYYY-MM-DD HH:MM:SS' strings so min/max compare as text
+    - attempts: ride_id -> [accept attempts, failed accepts, last_attempt_at, destination]
+      (history CSV only; a ride was accepted if it has more attempts than failures)
+    - rejections: rejection reason -> set of ride_ids
+    - unidentified: rows without a ride_id (cards with no API match)
+    """
+
+    __slots__ = ('rows', 'unidentified', 'seen', 'rides', 'attempts', 'rejections')
+
+    def __init__(self):
+        self.rows = 0
+        self.unidentified = 0
+        self.seen = {}
+        self.rides = {}
+        self.attempts = {}
+        self.rejections = {}
+
+    def add(self, seen_at, ride, destination, met_criteria=False, rejection_reason=None):
+        """Add one observation of a ride seen at seen_at"""
+        self.rows += 1
+        ride_id = ride.ride_id
+        if ride_id == 'N/A':
+            self.unidentified += 1
+            return
+
+        self.seen.setdefault(destination, {}).setdefault(seen_at[11:13], set()).add(ride_id)
+
+        if rejection_reason and rejection_reason != 'N/A':
+            self.rejections.setdefault(rejection_reason, set()).add(ride_id)
+
+        # meets_criteria is logged before the accept attempt; a failed attempt
+        # logs a second 'Failed to accept job' row for the same ride
+        failed = rejection_reason == FAILED_ACCEPT_REASON
+        if met_criteria or failed:
+            attempt = self.attempts.setdefault(ride_id, [0, 0, seen_at, destination])
+            if met_criteria:
+                attempt[0] += 1
+                if seen_at >= attempt[2]:
+                    attempt[2:] = [seen_at, destination]
+            if failed:
+                attempt[1] += 1
+
+        entry = self.rides.get(ride_id)
+        if entry is None:
+            self.rides[ride_id] = [seen_at, seen_at, ride.vehicle_type, ride.amount_cents, ride.currency]
+        else:
+            if seen_at < entry[0]:
+                entry[0] = seen_at
+            if seen_at >= entry[1]:
+                # Keep the latest price seen for the ride
+                entry[1] = seen_at
+                entry[2:] = [ride.vehicle_type, ride.amount_cents, ride.currency]
+
+    def merge(self, other):
+        """Fold another Aggregates into this one"""
+        self.rows += other.rows
+        self.unidentified += other.unidentified
+        for destination, hours in other.seen.items():
+            mine = self.seen.setdefault(destination, {})
+            for hour, ride_ids in hours.items():
+                mine.setdefault(hour, set()).update(ride_ids)
+        for reason, ride_ids in other.rejections.items():
+            self.rejections.setdefault(reason, set()).update(ride_ids)
+        for ride_id, theirs in other.attempts.items():
+            attempt = self.attempts.get(ride_id)
+            if attempt is None:
+                self.attempts[ride_id] = list(theirs)
+                continue
+            attempt[0] += theirs[0]
+            attempt[1] += theirs[1]
+            if theirs[2] >= attempt[2]:
+                attempt[2:] = theirs[2:]
+        for ride_id, theirs in other.rides.items():
+            entry = self.rides.get(ride_id)
+            if entry is None:
+                self.rides[ride_id] = list(theirs)
+                continue
+            if theirs[0] < entry[0]:
+                entry[0] = theirs[0]
+            if theirs[1] >= entry[1]:
+                entry[1] = theirs[1]
+                entry[2:] = theirs[2:]
+        return self
+
+    def accepted(self):
+        """destination -> hour -> count of rides accepted, by their last attempt"""
+        accepted = {}
+        for attempts, failures, attempted_at, destination in self.attempts.values():
+            if attempts > failures:
+                hours = accepted.setdefault(destination, {})
+                hours[attempted_at[11:13]] = hours.get(attempted_at[11:13], 0) + 1
+        return accepted
+
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'unidentified': self.unidentified,
+            'seen': {
+                destination: {hour: sorted(ride_ids) for hour, ride_ids in hours.items()}
+                for destination, hours in self.seen.items()
+            },
+            'rides': self.rides,
+            'attempts': self.attempts,
+            'rejections': {reason: sorted(ride_ids) for reason, ride_ids in self.rejections.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregates = cls()
+        aggregates.rows = data['rows']
+        aggregates.unidentified = data['unidentified']
+        aggregates.seen = {
+            destination: {hour: set(ride_ids) for hour, ride_ids in hours.items()}
+            for destination, hours in data['seen'].items()
+        }
+        aggregates.rides = data['rides']
+        aggregates.attempts = data['attempts']
+        aggregates.rejections = {reason: set(ride_ids) for reason, ride_ids in data['rejections'].items()}
+        return aggregates
+
+
+def destination_key(dropoff, destinations):
+    """Group a dropoff address under the first matching destination name, if any are given"""
+    if not destinations:
+        return dropoff
+    lowered = dropoff.lower()
+    for destination in destinations:
+        if destination.lower() in lowered:
+            return destination
+    return 'Other'
+
+
+def iter_history_chunks(path, offset=0, chunk_rows=5000):
+    """Yield (rows, end_offset) chunks of job_history.csv starting at byte offset.
+
+    end_offset is the byte position just after the last complete row of the
+    chunk, so processing can resume from it later.
+    """
+    consumed = [offset]
+
+    def lines(f):
+        for raw in f:
+            if not raw.endswith(b'\n'):
+                # Row still being written; leave it for the next run
+                return
+            consumed[0] += len(raw)
+            yield raw.decode('utf-8')
+
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        reader = csv.reader(lines(f))
+        chunk = []
+        for row in reader:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield chunk, consumed[0]
+                chunk = []
+        if chunk:
+            yield chunk, consumed[0]
+
+
+def process_history(path, aggregates, offset, destinations, chunk_rows):
+    """Stream job_history.csv from offset into aggregates; returns the new offset"""
+    for rows, end_offset in iter_history_chunks(path, offset, chunk_rows):
+        for row in rows:
+            if len(row) < 17 or row[0] == 'timestamp':
+                continue
+            ride = RideRecord.from_csv_row(row)
+            aggregates.add(
+                row[0],
+                ride,
+                destination_key(ride.dropoff_location, destinations),
+                met_criteria=row[15] == 'True',
+                rejection_reason=row[16],
+            )
+        offset = end_offset
+    return offset
+
+
+def response_timestamp(path):
+    """Capture time of an api_response file, from its name or else its mtime"""
+    match = RESPONSE_NAME_RE.search(os.path.basename(path))
+    if match:
+        return datetime.strptime(match.group(1) + match.group(2), '%Y%m%d%H%M%S').strftime(TIMESTAMP_FORMAT)
+    return datetime.fromtimestamp(os.path.getmtime(path)).strftime(TIMESTAMP_FORMAT)
+
+
+def process_response(path, aggregates, destinations):
+    """Add every ride in one saved API response to aggregates.
+
+    Each file holds a single poll response, so one file is one chunk.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    results = data.get('results', []) if isinstance(data, dict) else []
+    seen_at = response_timestamp(path)
+    for api_job in results:
+        ride = RideRecord.from_api(api_job)
+        aggregates.add(seen_at, ride, destination_key(ride.dropoff_location or '', destinations))
+
+
+def cache_path(cache_dir, path):
+    digest = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, f'{digest}.json')
+
+
+def load_cache(cache_dir, path, destinations):
+    """Return the cached entry for path if it was built with the same settings"""
+    try:
+        with open(cache_path(cache_dir, path), encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if entry.get('version') != CACHE_VERSION or entry.get('destinations') != destinations:
+        return None
+    return entry
+
+
+def analyse_file(task):
+    """Worker: bring one source file's cached aggregates up to date.
+
+    Returns (path, entry, status) where status is 'cached', 'resumed' or 'processed'.
+    """
+    path, kind, cache_dir, destinations, chunk_rows = task
+    stat = os.stat(path)
+    entry = load_cache(cache_dir, path, destinations)
+
+    if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+        return path, entry, 'cached'
+
+    if kind == 'history':
+        if entry and stat.st_size > entry['size'] and entry.get('offset'):
+            # Append-only history: continue after the last processed row
+            aggregates = Aggregates.from_dict(entry['aggregates'])
+            offset = process_history(path, aggregates, entry['offset'], destinations, chunk_rows)
+            status = 'resumed'
+        else:
+            aggregates = Aggregates()
+            offset = process_history(path, aggregates, 0, destinations, chunk_rows)
+            status = 'processed'
+    else:
+        aggregates = Aggregates()
+        process_response(path, aggregates, destinations)
+        offset = stat.st_size
+        status = 'processed'
+
+    entry = {
+        'version': CACHE_VERSION,
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'offset': offset,
+        'destinations': destinations,
+        'aggregates': aggregates.to_dict(),
+    }
+    tmp_path = cache_path(cache_dir, path) + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, cache_path(cache_dir, path))
+    return path, entry, status
+
+
+def run_analysis(history_paths, response_paths, cache_dir='.analytics_cache', workers=None,
+                 destinations=None, chunk_rows=5000):
+    """Aggregate all sources in parallel and return the merged Aggregates"""
+    os.makedirs(cache_dir, exist_ok=True)
+    destinations = destinations or []
+    tasks = [(path, 'history', cache_dir, destinations, chunk_rows) for path in history_paths]
+    tasks += [(path, 'response', cache_dir, destinations, chunk_rows) for path in response_paths]
+
+    total = Aggregates()
+    statuses = {'cached': 0, 'resumed': 0, 'processed': 0}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for path, entry, status in executor.map(analyse_file, tasks, chunksize=16):
+            statuses[status] += 1
+            # Merge as results arrive so only one partial is held at a time
+            total.merge(Aggregates.from_dict(entry['aggregates']))
+
+    print(f"Sources: {len(tasks)} ({statuses['processed']} processed, "
+          f"{statuses['resumed']} resumed, {statuses['cached']} from cache)")
+    return total
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def price_distributions(aggregates):
+    """Per (vehicle type, currency): sorted latest prices (in cents) of distinct rides"""
+    prices = {}
+    for _, _, vehicle_type, amount_cents, currency in aggregates.rides.values():
+        prices.setdefault((vehicle_type or 'N/A', currency or 'N/A'), []).append(amount_cents)
+    for values in prices.values():
+        values.sort()
+    return prices
+
+
+def time_to_disappear(aggregates):
+    """ride_id -> seconds between first and last sighting"""
+    durations = {}
+    for ride_id, (first_seen, last_seen, *_) in aggregates.rides.items():
+        first = datetime.strptime(first_seen, TIMESTAMP_FORMAT)
+        last = datetime.strptime(last_seen, TIMESTAMP_FORMAT)
+        durations[ride_id] = (last - first).total_seconds()
+    return durations
+
+
+def write_rides_csv(aggregates, durations, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ride_id', 'vehicle_type', 'first_seen', 'last_seen', 'seconds_visible',
+                         'auction_amount', 'auction_currency'])
+        for ride_id, (first_seen, last_seen, vehicle_type, amount_cents, currency) in aggregates.rides.items():
+            writer.writerow([ride_id, vehicle_type, first_seen, last_seen, int(durations[ride_id]),
+                             f"{amount_cents / 100:.2f}", currency])
+    print(f"✅ Saved per-ride summary to {path}")
+
+
+def print_report(aggregates, top=20):
+    print("\n" + "-" * 50)
+    print(f"Observations: {aggregates.rows} ({aggregates.unidentified} without a ride_id)")
+    print(f"Distinct rides: {len(aggregates.rides)}")
+
+    print("\nRides seen / accepted per destination and hour:")
+    accepted = aggregates.accepted()
+    cells = [
+        (len(ride_ids), destination, hour, accepted.get(destination, {}).get(hour, 0))
+        for destination, hours in aggregates.seen.items()
+        for hour, ride_ids in hours.items()
+    ]
+    for seen, destination, hour, accepted_count in sorted(cells, reverse=True)[:top]:
+        print(f"- {destination[:60]} @ {hour}:00  seen={seen} accepted={accepted_count}")
+
+    print("\nPrice distribution per vehicle class (distinct rides):")
+    for (vehicle_type, currency), values in sorted(price_distributions(aggregates).items()):
+        buckets = {}
+        for value in values:
+            bucket = value // PRICE_BUCKET_CENTS * PRICE_BUCKET_CENTS
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+        print(f"- {vehicle_type} ({currency}): n={len(values)} min={values[0] / 100:.2f} "
+              f"median={statistics.median(values) / 100:.2f} p90={percentile(values, 0.9) / 100:.2f} "
+              f"max={values[-1] / 100:.2f}")
+        print("  " + ", ".join(f"{b / 100:.0f}+: {n}" for b, n in sorted(buckets.items())))
+
+    durations = sorted(time_to_disappear(aggregates).values())
+    if durations:
+        print("\nTime to disappear (first to last sighting):")
+        print(f"- median={statistics.median(durations):.0f}s p90={percentile(durations, 0.9):.0f}s "
+              f"max={durations[-1]:.0f}s")
+
+    if aggregates.rejections:
+        print("\nRejection reasons (distinct rides):")
+        counts = {reason: len(ride_ids) for reason, ride_ids in aggregates.rejections.items()}
+        total = sum(counts.values())
+        for reason, count in sorted(counts.items(), key=lambda item: -item[1]):
+            print(f"- {reason}: {count} ({count / total:.0%})")
+    print("-" * 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--history', nargs='*', default=['job_history.csv'], help="job history CSV files")
+    parser.add_argument('--responses', default='api_response_*.json', help="glob for saved API responses")
+    parser.add_argument('--cache-dir', default='.analytics_cache')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--chunk-rows', type=int, default=5000, help="CSV rows per chunk")
+    parser.add_argument('--destinations', default=os.getenv("ACCEPTABLE_DESTINATIONS", ""),
+                        help="comma-separated names to group dropoffs under (default: ACCEPTABLE_DESTINATIONS)")
+    parser.add_argument('--top', type=int, default=20, help="destination/hour rows to show")
+    parser.add_argument('--rides-out', help="write per-ride time-to-disappear CSV to this path")
+    args = parser.parse_args()
+
+    history_paths = [path for path in args.history if os.path.exists(path)]
+    response_paths = sorted(glob.glob(args.responses)) if args.responses else []
+    destinations = [d.strip() for d in args.destinations.split(',') if d.strip()]
+
+    aggregates = run_analysis(history_paths, response_paths, args.cache_dir, args.workers,
+                              destinations, args.chunk_rows)
+    print_report(aggregates, args.top)
+    if args.rides_out:
+        write_rides_csv(aggregates, time_to_disappear(aggregates), args.rides_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Accept-path latency benchmark against a local fake fleet page.
+
+Compares the chromedriver accept path (find accept button, click, wait for the
+confirm overlay with WebDriverWait, click) with the pre-armed in-page helper.
+Timing covers the decision-to-confirm-click window only, not bid verification.
+
+Usage:
+    python bench_accept.py [--runs 20] [--overlay-delay 30] [--cdp] [--headed]
+                           [--chromedriver PATH] [--chrome-binary PATH]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+
+from accept_helper import JOB_CARD_SELECTOR
+from cdp_transport import CDPTransport
+from scraper import FleetScraper
+
+FAKE_PAGE = """<!DOCTYPE html>
+<html><body>
+<div id="jobs"></div>
+<script>
+var OVERLAY_DELAY_MS = %(overlay_delay)d;
+function resetPage() {
+  window.__confirmedAt = null;
+  var overlay = document.getElementById('overlay');
+  if (overlay) overlay.remove();
+  var jobs = document.getElementById('jobs');
+  jobs.innerHTML = '';
+  for (var i = 0; i < %(cards)d; i++) {
+    jobs.insertAdjacentHTML('beforeend',
+      '<div class="--bg-white --rounded-lg --flex-col">' +
+      '<div class="--text-sm --font-bold">Sedan</div>' +
+      '<div class="--shrink-0"><div class="--text-sm --font-bold">2025-05-24 14:45</div></div>' +
+      '<div class="--line-clamp-1 --text-sm">Kuala Lumpur International Airport</div>' +
+      '<div class="--line-clamp-1 --text-sm">Genting</div>' +
+      '<div class="--text-base --text-primary">MYR 75.00</div>' +
+      '<div is="e-tracing" tracing-name="user_available_accept" class="--rounded-lg --text-white">Accept</div>' +
+      '</div>');
+  }
+}
+document.addEventListener('click', function (e) {
+  if (e.target.getAttribute('tracing-name') === 'user_available_accept') {
+    setTimeout(function () {
+      var overlay = document.createElement('div');
+      overlay.id = 'overlay';
+      overlay.innerHTML = '<div class="--w-full --h-full --absolute --top-0 --left-0"></div>';
+      overlay.firstChild.addEventListener('click', function () {
+        window.__confirmedAt = performance.now();
+      });
+      document.body.appendChild(overlay);
+    }, OVERLAY_DELAY_MS);
+  }
+});
+resetPage();
+</script>
+</body></html>
+"""
+
+
+def reset(driver):
+    driver.execute_script("resetPage();")
+    return driver.find_elements(By.CSS_SELECTOR, JOB_CARD_SELECTOR)
+
+
+def confirmed(driver):
+    return driver.execute_script("return window.__confirmedAt !== null;")
+
+
+def bench_chromedriver(scraper, runs, card_index):
+    timings = []
+    for _ in range(runs):
+        card = reset(scraper.driver)[card_index]
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            scraper.parse_job_card(card)  # the old accept path re-parsed the card
+            ok = scraper.click_accept_and_confirm(card)
+            elapsed = time.perf_counter() - start
+        if ok and confirmed(scraper.driver):
+            timings.append(elapsed * 1000)
+    return timings
+
+
+def bench_armed(scraper, runs, card_index):
+    timings = []
+    for _ in range(runs):
+        card = reset(scraper.driver)[card_index]
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Arming and scoring happen while rides are parsed, outside the window
+            scraper.arm_accept_controls()
+            ride = scraper.merge_job_data([], scraper.parse_job_card(card))
+            start = time.perf_counter()
+            ok = scraper.accept_job_armed(card_index, ride)
+            elapsed = time.perf_counter() - start
+        if ok and confirmed(scraper.driver):
+            timings.append(elapsed * 1000)
+    return timings
+
+
+def report(name, timings, runs):
+    if not timings:
+        print(f"{name:<14} no successful runs out of {runs}")
+        return
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{name:<14} ok={len(timings)}/{runs} median={statistics.median(timings):7.1f}ms "
+          f"p95={p95:7.1f}ms min={timings[0]:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--cards', type=int, default=30)
+    parser.add_argument('--card-index', type=int, default=15)
+    parser.add_argument('--overlay-delay', type=int, default=30, help="ms before the confirm overlay mounts")
+    parser.add_argument('--cdp', action='store_true', help="run the armed path over the direct CDP transport")
+    parser.add_argument('--headed', action='store_true')
+    parser.add_argument('--chromedriver', default=os.getenv("CHROMEDRIVER"), help="path to chromedriver")
+    parser.add_argument('--chrome-binary', default=os.getenv("CHROME_BINARY"), help="path to Chrome")
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile('w', suffix='.html', delete=False, encoding='utf-8') as f:
+        f.write(FAKE_PAGE % {'overlay_delay': args.overlay_delay, 'cards': args.cards})
+        page_path = f.name
+
+    options = Options()
+    if args.chrome_binary:
+        options.binary_location = args.chrome_binary
+    if not args.headed:
+        options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    service = Service(executable_path=args.chromedriver) if args.chromedriver else Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    cdp = None
+    try:
+        driver.get('file://' + page_path)
+        if args.cdp:
+            cdp = CDPTransport.from_driver(driver)
+            cdp.connect(driver.current_url)
+        scraper = FleetScraper.from_driver(driver, cdp=cdp, pre_armed_accept=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.install_accept_helper()
+
+        print(f"{args.runs} runs, {args.cards} cards, overlay delay {args.overlay_delay}ms"
+              f"{', armed path over CDP' if cdp else ''}")
+        report("chromedriver", bench_chromedriver(scraper, args.runs, args.card_index), args.runs)
+        report("pre-armed", bench_armed(scraper, args.runs, args.card_index), args.runs)
+    finally:
+        if cdp:
+            cdp.close()
+        driver.quit()
+        os.unlink(page_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import base64
+import json
+import threading
+import urllib.request
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+try:
+    import websocket  # websocket-client, only needed when USE_CDP_TRANSPORT=true
+except ImportError:
+    websocket = None
+
+
+def decode_response_body(response_body):
+    """Text of a Network.getResponseBody result, decoding base64 bodies"""
+    body = response_body.get('body', '')
+    if response_body.get('base64Encoded'):
+        body = base64.b64decode(body).decode('utf-8', errors='replace')
+    return body
+
+
+class CDPError(Exception):
+    """Raised when a DevTools command fails or the socket is unavailable"""
+
+
+class CDPTransport:
+    """Direct Chrome DevTools Protocol websocket to the browser Selenium launched.
+
+    Selenium stays in charge of launching Chrome and logging in; this transport
+    talks to the page target directly so hot-path operations (network capture,
+    Runtime.evaluate and click input) skip the chromedriver HTTP hop. Commands
+    are pipelined: `send()` returns a Future immediately and a reader thread
+    resolves it when Chrome replies.
+    """
+
+    def __init__(self, debugger_address, timeout=10, max_buffered_responses=500):
+        self.debugger_address = debugger_address
+        self.timeout = timeout
+        self.ws = None
+        self._next_id = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._reader = None
+        self._closed = threading.Event()
+        self._watched_urls = []
+        self._responses = deque(maxlen=max_buffered_responses)
+
+    @classmethod
+    def from_driver(cls, driver, **kwargs):
+        """Build a transport for the Chrome instance behind a Selenium driver"""
+        options = driver.capabilities.get('goog:chromeOptions', {})
+        debugger_address = options.get('debuggerAddress')
+        if not debugger_address:
+            raise CDPError("Selenium did not expose a Chrome debugger address")
+        return cls(debugger_address, **kwargs)
+
+    def connect(self, current_url=None):
+        """Open the websocket to the page target (preferring the one at current_url)"""
+        if websocket is None:
+            raise CDPError("websocket-client is not installed (pip install websocket-client)")
+
+        with urllib.request.urlopen(f"http://{self.debugger_address}/json", timeout=self.timeout) as resp:
+            targets = json.loads(resp.read().decode('utf-8'))
+        pages = [t for t in targets if t.get('type') == 'page' and t.get('webSocketDebuggerUrl')]
+        if not pages:
+            raise CDPError("No page target found on the debugger address")
+        target = next((t for t in pages if current_url and t.get('url') == current_url), pages[0])
+
+        # Chrome rejects websocket handshakes carrying an unexpected Origin header
+        self.ws = websocket.create_connection(
+            target['webSocketDebuggerUrl'], timeout=self.timeout, suppress_origin=True
+        )
+        self.ws.settimeout(None)
+        self._closed.clear()
+        self._reader = threading.Thread(target=self._read_loop, name='cdp-reader', daemon=True)
+        self._reader.start()
+        print(f"✅ Connected CDP transport to {target.get('url')}")
+
+    def close(self):
+        """Close the websocket and fail any outstanding commands"""
+        self._closed.set()
+        if self.ws:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+            self.ws = None
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(CDPError("CDP transport closed"))
+
+    @property
+    def connected(self):
+        return self.ws is not None and not self._closed.is_set()
+
+    def _read_loop(self):
+        while not self._closed.is_set():
+            try:
+                raw = self.ws.recv()
+            except Exception as e:
+                if not self._closed.is_set():
+                    print(f"CDP transport disconnected: {str(e)}")
+                    self.close()
+                return
+            if not raw:
+                continue
+            try:
+                message = json.loads(raw)
+            except json.JSONDecodeError:
+                continue
+
+            if 'id' in message:
+                with self._lock:
+                    future = self._pending.pop(message['id'], None)
+                if future is None:
+                    continue
+                if 'error' in message:
+                    future.set_exception(CDPError(message['error'].get('message', str(message['error']))))
+                else:
+                    future.set_result(message.get('result', {}))
+            elif message.get('method') == 'Network.responseReceived':
+                params = message.get('params', {})
+                url = params.get('response', {}).get('url', '')
+                if any(fragment in url for fragment in self._watched_urls):
+                    self._responses.append(params['requestId'])
+
+    def send(self, method, params=None):
+        """Send a command without waiting; returns a Future for its result"""
+        if not self.connected:
+            raise CDPError("CDP transport is not connected")
+        future = Future()
+        with self._lock:
+            self._next_id += 1
+            message_id = self._next_id
+            self._pending[message_id] = future
+        try:
+            self.ws.send(json.dumps({'id': message_id, 'method': method, 'params': params or {}}))
+        except Exception as e:
+            with self._lock:
+                self._pending.pop(message_id, None)
+            raise CDPError(f"Failed to send {method}: {str(e)}")
+        return future
+
+    def call(self, method, params=None, timeout=None):
+        """Send a command and wait for its result"""
+        return self.wait(self.send(method, params), timeout)
+
+    def wait(self, future, timeout=None):
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except FutureTimeoutError:
+            raise CDPError("Timed out waiting for CDP response")
+
+    # Network capture
+
+    def watch_responses(self, url_fragment):
+        """Enable the Network domain and buffer request ids of matching responses"""
+        if url_fragment not in self._watched_urls:
+            self._watched_urls.append(url_fragment)
+        self.call('Network.enable')
+
+    def get_response_bodies(self):
+        """Fetch bodies of all buffered matching responses, pipelining the requests"""
+        request_ids = []
+        while self._responses:
+            request_ids.append(self._responses.popleft())
+        futures = [self.send('Network.getResponseBody', {'requestId': rid}) for rid in request_ids]
+        bodies = []
+        for future in futures:
+            try:
+                bodies.append(decode_response_body(self.wait(future)))
+            except CDPError as e:
+                # Body may already be evicted from Chrome's buffer
+                print(f"Could not fetch response body: {str(e)}")
+        return bodies
+
+    # Runtime
+
+    def evaluate(self, expression, timeout=None):
+        """Evaluate a JS expression in the page and return its value"""
+        result = self.call('Runtime.evaluate', {
+            'expression': expression,
+            'returnByValue': True,
+            'awaitPromise': True,
+        }, timeout)
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            text = details.get('exception', {}).get('description') or details.get('text')
+            raise CDPError(f"JS error: {text}")
+        return result.get('result', {}).get('value')
+
+    # Input
+
+    def click_at(self, x, y):
+        """Dispatch a left click at viewport coordinates (press and release pipelined)"""
+        base = {'x': x, 'y': y, 'button': 'left', 'clickCount': 1}
+        pressed = self.send('Input.dispatchMouseEvent', dict(base, type='mousePressed'))
+        released = self.send('Input.dispatchMouseEvent', dict(base, type='mouseReleased'))
+        self.wait(pressed)
+        self.wait(released)
+
+    def click_selector(self, selector, index=0):
+        """Click the index-th element matching selector. Returns False if it is not present."""
+        point = self.evaluate(
+            "(() => {"
+            f"const el = document.querySelectorAll({json.dumps(selector)})[{int(index)}];"
+            "if (!el) return null;"
+            "el.scrollIntoView({block: 'center', inline: 'center'});"
+            "const r = el.getBoundingClientRect();"
+            "return {x: r.left + r.width / 2, y: r.top + r.height / 2};"
+            "})()"
+        )
+        if not point:
+            return False
+        self.click_at(point['x'], point['y'])
+        return True
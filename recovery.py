@@ -0,0 +1,163 @@
+import time
+from enum import Enum
+
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+
+class ScraperState(Enum):
+    LOGGED_OUT = 'logged-out'
+    LOGGING_IN = 'logging-in'
+    READY = 'ready'
+    POLLING = 'polling'
+    ACCEPTING = 'accepting'
+    DEGRADED = 'degraded'
+
+
+class FailureClass(Enum):
+    """Kind of failure, named after the first recovery strategy tried for it"""
+    RE_PROBE = 're-probe'            # element/wait timeout, page may just be slow
+    SOFT_RELOAD = 'soft-reload'      # stale DOM or unexpected page state
+    RE_LOGIN = 're-login'            # session expired or login failed
+    BROWSER_RESTART = 'browser-restart'  # browser/driver session is gone
+
+
+# Strategies in escalation order; recovery starts at the failure's own class
+RECOVERY_ORDER = [
+    FailureClass.RE_PROBE,
+    FailureClass.SOFT_RELOAD,
+    FailureClass.RE_LOGIN,
+    FailureClass.BROWSER_RESTART,
+]
+
+ALLOWED_TRANSITIONS = {
+    ScraperState.LOGGED_OUT: {ScraperState.LOGGING_IN, ScraperState.DEGRADED},
+    ScraperState.LOGGING_IN: {ScraperState.READY, ScraperState.LOGGED_OUT, ScraperState.DEGRADED},
+    ScraperState.READY: {ScraperState.POLLING, ScraperState.LOGGED_OUT, ScraperState.DEGRADED},
+    ScraperState.POLLING: {ScraperState.READY, ScraperState.ACCEPTING, ScraperState.DEGRADED},
+    ScraperState.ACCEPTING: {ScraperState.READY, ScraperState.POLLING, ScraperState.DEGRADED},
+    ScraperState.DEGRADED: {ScraperState.READY, ScraperState.LOGGING_IN, ScraperState.LOGGED_OUT},
+}
+
+BROWSER_GONE_MESSAGES = ('chrome not reachable', 'disconnected', 'session deleted', 'target window already closed')
+
+
+def classify_failure(error):
+    """Map an exception to the FailureClass that should handle it"""
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return FailureClass.BROWSER_RESTART
+    if isinstance(error, StaleElementReferenceException):
+        return FailureClass.SOFT_RELOAD
+    if isinstance(error, (TimeoutException, NoSuchElementException)):
+        return FailureClass.RE_PROBE
+    if isinstance(error, WebDriverException):
+        message = str(error).lower()
+        if any(text in message for text in BROWSER_GONE_MESSAGES):
+            return FailureClass.BROWSER_RESTART
+    if isinstance(error, (ConnectionError, OSError)):
+        return FailureClass.BROWSER_RESTART
+    return FailureClass.SOFT_RELOAD
+
+
+class Incident:
+    """A single failure and its recovery"""
+
+    def __init__(self, failure_class, error, state):
+        self.failure_class = failure_class
+        self.error = str(error)
+        self.failed_state = state
+        self.started_at = time.monotonic()
+        self.attempts = 0
+        self.strategy = None
+        self.time_to_recover = None
+
+    @property
+    def recovered(self):
+        return self.time_to_recover is not None
+
+
+class LifecycleStateMachine:
+    """Scraper lifecycle states plus per-incident recovery bookkeeping.
+
+    Failures move the machine to DEGRADED and open an Incident; the scraper then
+    runs recovery strategies (escalating from the failure's own class) with
+    bounded exponential backoff between attempts, and `resolve()` records the
+    time-to-recover.
+    """
+
+    def __init__(self, backoff_base=0.5, backoff_max=30.0, max_attempts=6):
+        self.state = ScraperState.LOGGED_OUT
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_attempts = max_attempts
+        self.incidents = []
+        self.current_incident = None
+
+    def transition(self, new_state):
+        """Move to new_state, warning (but not failing) on unexpected transitions"""
+        if new_state == self.state:
+            return
+        if new_state not in ALLOWED_TRANSITIONS[self.state]:
+            print(f"⚠️ Unexpected state transition {self.state.value} -> {new_state.value}")
+        print(f"🔁 State: {self.state.value} -> {new_state.value}")
+        self.state = new_state
+
+    def report_failure(self, error, failure_class=None):
+        """Record a failure and enter DEGRADED. Returns the open incident."""
+        failure_class = failure_class or classify_failure(error)
+        if self.current_incident is None:
+            self.current_incident = Incident(failure_class, error, self.state)
+            self.incidents.append(self.current_incident)
+        elif RECOVERY_ORDER.index(failure_class) > RECOVERY_ORDER.index(self.current_incident.failure_class):
+            # A more severe failure during an open incident escalates it
+            self.current_incident.failure_class = failure_class
+        print(f"❌ Failure ({failure_class.value}) in state {self.state.value}: {str(error)[:200]}")
+        self.transition(ScraperState.DEGRADED)
+        return self.current_incident
+
+    def backoff(self, attempt):
+        """Bounded exponential backoff delay in seconds for the given attempt (0-based)"""
+        if attempt <= 0:
+            return 0
+        return min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+
+    def strategies(self, incident):
+        """Recovery strategies to try for an incident, one per attempt, escalating"""
+        start = RECOVERY_ORDER.index(incident.failure_class)
+        plan = []
+        for attempt in range(self.max_attempts):
+            plan.append(RECOVERY_ORDER[min(start + attempt, len(RECOVERY_ORDER) - 1)])
+        return plan
+
+    def resolve(self, strategy):
+        """Close the open incident and record its time-to-recover"""
+        incident = self.current_incident
+        if incident is None:
+            return None
+        incident.strategy = strategy
+        incident.time_to_recover = time.monotonic() - incident.started_at
+        self.current_incident = None
+        self.transition(ScraperState.READY)
+        print(f"✅ Recovered via {strategy.value} after {incident.attempts} attempt(s) "
+              f"in {incident.time_to_recover:.1f}s")
+        return incident
+
+    def summary(self):
+        """Print a short report of incidents and recovery times"""
+        if not self.incidents:
+            print("No incidents recorded")
+            return
+        print(f"Incidents: {len(self.incidents)}")
+        for incident in self.incidents:
+            if incident.recovered:
+                outcome = f"recovered via {incident.strategy.value} in {incident.time_to_recover:.1f}s"
+            else:
+                outcome = f"unrecovered after {incident.attempts} attempt(s)"
+            print(f"- {incident.failure_class.value} in {incident.failed_state.value}: {outcome}")
+            print(f"  Error: {incident.error[:200]}")
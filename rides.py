@@ -0,0 +1,192 @@
+import sys
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+TIME_FORMAT = '%Y-%m-%d %H:%M'
+
+
+def _intern(value):
+    """Intern a string so repeated locations/vehicle classes share one object"""
+    if value is None:
+        return None
+    return sys.intern(str(value))
+
+
+def _parse_time(value):
+    """Parse an API time string once, returning None if missing or invalid"""
+    if not value or value == 'N/A':
+        return None
+    try:
+        return datetime.strptime(value, TIME_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_cents(value):
+    """Convert an API amount (string or number) to integer cents"""
+    try:
+        return int((Decimal(str(value)) * 100).to_integral_value())
+    except (InvalidOperation, TypeError, ValueError):
+        return 0
+
+
+def _parse_int(value):
+    """Convert an API integer field, returning None if missing or invalid"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RideRecord:
+    """Compact, parsed representation of a single ride.
+
+    Built once per poll straight from the API payload (or from a job card when
+    no API match exists) and used for matching, acceptance rules, printing and
+    CSV history instead of passing dict copies around.
+    """
+
+    __slots__ = (
+        'ride_id',
+        'vehicle_type',
+        'scheduled_pickup_text',
+        'auction_start',
+        'amount_cents',
+        'currency',
+        'pickup_location',
+        'dropoff_location',
+        'distance',
+        'duration',
+        'meet_and_greet',
+        'has_driver_instruction',
+        'can_accept',
+        'accept_button',
+    )
+
+    def __init__(self, ride_id='N/A', vehicle_type=None, scheduled_pickup_text=None,
+                 auction_start=None, amount_cents=0, currency='N/A',
+                 pickup_location='', dropoff_location='', distance=None,
+                 duration=None, meet_and_greet=False, has_driver_instruction=False,
+                 can_accept=False, accept_button=None):
+        self.ride_id = ride_id
+        self.vehicle_type = _intern(vehicle_type)
+        # Only printed and logged, so kept as the source text (API or job card format)
+        self.scheduled_pickup_text = scheduled_pickup_text if scheduled_pickup_text not in (None, '') else None
+        self.auction_start = auction_start
+        self.amount_cents = amount_cents
+        self.currency = _intern(currency)
+        self.pickup_location = _intern(pickup_location)
+        self.dropoff_location = _intern(dropoff_location)
+        self.distance = distance
+        self.duration = duration
+        self.meet_and_greet = meet_and_greet
+        self.has_driver_instruction = has_driver_instruction
+        self.can_accept = can_accept
+        self.accept_button = accept_button
+
+    @classmethod
+    def from_api(cls, api_job):
+        """Build a record from one entry of the API `results` list"""
+        return cls(
+            ride_id=str(api_job.get('ride_id', 'N/A')),
+            vehicle_type=(api_job.get('vehicle_class') or {}).get('name'),
+            scheduled_pickup_text=api_job.get('from_time_str'),
+            auction_start=_parse_time(api_job.get('auction_start_time_str')),
+            amount_cents=_parse_cents(api_job.get('auction_amount', 0)),
+            currency=api_job.get('auction_currency', 'N/A'),
+            pickup_location=api_job.get('from_name', ''),
+            dropoff_location=api_job.get('to_name', 'N/A'),
+            distance=_parse_int(api_job.get('distance')),
+            duration=_parse_int(api_job.get('duration')),
+            meet_and_greet=bool(api_job.get('meet_and_greet', 0)),
+            has_driver_instruction=bool(api_job.get('has_driver_instruction', 0)),
+        )
+
+    @classmethod
+    def from_job_card(cls, visual_job_info):
+        """Build a fallback record from parsed job card info (no API match)"""
+        return cls(
+            vehicle_type=visual_job_info['vehicle_type'],
+            scheduled_pickup_text=visual_job_info.get('scheduled_pickup_time'),
+            pickup_location=visual_job_info['pickup_location'],
+            dropoff_location=visual_job_info['dropoff_location'],
+            can_accept=visual_job_info['can_accept'],
+            accept_button=visual_job_info.get('accept_button'),
+        )
+
+    @classmethod
+    def from_csv_row(cls, row):
+        """Build a record from a job_history.csv row (inverse of to_csv_row)"""
+        return cls(
+            ride_id=row[1],
+            vehicle_type=row[2],
+            scheduled_pickup_text=row[3],
+            auction_start=_parse_time(row[4]),
+            amount_cents=_parse_cents(row[5]),
+            currency=row[6],
+            pickup_location=row[7],
+            dropoff_location=row[8],
+            distance=_parse_int(row[9]),
+            duration=_parse_int(row[10]),
+            meet_and_greet=row[11] == 'True',
+            has_driver_instruction=row[12] == 'True',
+            can_accept=row[14] == 'True',
+        )
+
+    def for_card(self, can_accept, accept_button=None):
+        """Copy of this record carrying one job card's state.
+
+        API records are cached for the whole poll and several cards can match
+        the same one, so card state is never written onto the cached record.
+        """
+        card_ride = RideRecord.__new__(RideRecord)
+        for name in self.__slots__:
+            setattr(card_ride, name, getattr(self, name))
+        card_ride.can_accept = can_accept
+        card_ride.accept_button = accept_button
+        return card_ride
+
+    @property
+    def auction_amount(self):
+        """Amount formatted with two decimals, e.g. '75.00'"""
+        sign = '-' if self.amount_cents < 0 else ''
+        cents = abs(self.amount_cents)
+        return f"{sign}{cents // 100}.{cents % 100:02d}"
+
+    @property
+    def scheduled_pickup_time(self):
+        return self.scheduled_pickup_text or 'N/A'
+
+    @property
+    def auction_start_time(self):
+        return self.auction_start.strftime(TIME_FORMAT) if self.auction_start else 'N/A'
+
+    def matches(self, visual_job_info):
+        """Check whether a parsed job card refers to this ride"""
+        return (self.vehicle_type == visual_job_info['vehicle_type'] and
+                self.pickup_location == visual_job_info['pickup_location'])
+
+    def to_csv_row(self, timestamp, meets_criteria, rejection_reason):
+        """Row for job_history.csv, in the same order as the CSV headers"""
+        return [
+            timestamp,
+            self.ride_id,
+            self.vehicle_type or 'N/A',
+            self.scheduled_pickup_time,
+            self.auction_start_time,
+            self.auction_amount,
+            self.currency,
+            self.pickup_location,
+            self.dropoff_location,
+            'N/A' if self.distance is None else self.distance,
+            'N/A' if self.duration is None else self.duration,
+            self.meet_and_greet,
+            self.has_driver_instruction,
+            True,  # is_available (always true since we're logging it)
+            self.can_accept,
+            meets_criteria,
+            rejection_reason or 'N/A'
+        ]
+
+    def __repr__(self):
+        return f"RideRecord(ride_id={self.ride_id!r}, vehicle_type={self.vehicle_type!r}, to={self.dropoff_location!r})"
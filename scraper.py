@@ -8,10 +8,28 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import (
+    TimeoutException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
 from dotenv import load_dotenv
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from rides import RideRecord
+from cdp_transport import CDPTransport, CDPError, decode_response_body
+from recovery import LifecycleStateMachine, ScraperState, FailureClass
+from accept_helper import (
+    JOB_CARD_SELECTOR,
+    ACCEPT_BUTTON_SELECTOR,
+    CONFIRM_BUTTON_SELECTOR,
+    VEHICLE_TYPE_SELECTOR,
+    LOCATION_SELECTOR,
+    build_accept_helper_js,
+    build_card_accept_point_js,
+    expected_card,
+)
 
 # Load environment variables
 load_dotenv()
@@ -24,16 +42,51 @@ print("-------------------")
 
 class FleetScraper:
     def __init__(self):
+        self.load_settings()
+        self.setup_csv()
+        
+        print(f"Initializing with email: {self.email}")
+        print(f"Acceptable destinations: {self.acceptable_destinations}")
+        if not self.email or not self.password:
+            raise ValueError("Please create a .env file with your EMAIL and PASSWORD")
+        
+        self.start_browser()
+
+    @classmethod
+    def from_driver(cls, driver, **settings):
+        """Wrap an already running browser without credentials, CSV setup or launch (e.g. for benchmarks).
+
+        Keyword arguments override settings loaded from the environment.
+        """
+        scraper = cls.__new__(cls)
+        scraper.load_settings()
+        for name, value in settings.items():
+            if not hasattr(scraper, name):
+                raise AttributeError(f"Unknown FleetScraper setting: {name}")
+            setattr(scraper, name, value)
+        scraper.attach_driver(driver)
+        return scraper
+
+    def load_settings(self):
+        """Load settings from the environment and initialise runtime state"""
         self.url = os.getenv("FLEET_URL", "https://companyname.com/fleet/")  # Default URL as fallback
         # Using EMAIL instead of USERNAME for clarity
         self.email = os.getenv("EMAIL")
         self.password = os.getenv("PASSWORD")
         self.acceptable_destinations = os.getenv("ACCEPTABLE_DESTINATIONS", "Genting,Melaka").split(",")
+        self.acceptable_destinations_lower = [d.lower() for d in self.acceptable_destinations]
         self.refresh_interval = int(os.getenv("REFRESH_INTERVAL", "30"))  # Default 30 seconds
         self.session_duration = int(os.getenv("SESSION_DURATION", "300"))  # Default 5 minutes (300 seconds)
         self.use_reload_button = os.getenv("USE_RELOAD_BUTTON", "true").lower() == "true"  # Default to true
         self.monitoring_mode = os.getenv("MONITORING_MODE", "false").lower() == "true"  # Default to false
-        self.api_data = None  # Store API data here
+        self.use_cdp_transport = os.getenv("USE_CDP_TRANSPORT", "false").lower() == "true"  # Default to false
+        self.pre_armed_accept = os.getenv("PRE_ARMED_ACCEPT", "false").lower() == "true"  # Default to false
+        self.job_card_timeout = int(os.getenv("JOB_CARD_TIMEOUT", "10"))  # Seconds to wait for job cards before probing
+        self.accept_confirm_timeout = 20  # Seconds to wait for the confirm overlay (below Selenium's script timeout)
+        self.api_data = None  # Parsed RideRecords from the API response
+        self.cdp = None  # Direct DevTools transport, set up after login when enabled
+        self.primed_response_bodies = []  # API responses loaded before the CDP socket was listening
+        self.api_url_fragment = "mfmyyv2bjh.execute-api.us-east-2.amazonaws.com/prod/sql-templates/run"
         
         # Setup CSV logging
         self.csv_file = 'job_history.csv'
@@ -56,13 +109,14 @@ class FleetScraper:
             'meets_criteria',
             'rejection_reason'
         ]
-        self.setup_csv()
-        
-        print(f"Initializing with email: {self.email}")
-        print(f"Acceptable destinations: {self.acceptable_destinations}")
-        if not self.email or not self.password:
-            raise ValueError("Please create a .env file with your EMAIL and PASSWORD")
         
+        self.lifecycle = LifecycleStateMachine(
+            backoff_max=float(os.getenv("RECOVERY_BACKOFF_MAX", "30")),  # Default 30 seconds
+            max_attempts=int(os.getenv("RECOVERY_MAX_ATTEMPTS", "6"))
+        )
+
+    def start_browser(self):
+        """Launch Chrome through chromedriver"""
         # Setup Chrome DevTools Protocol
         chrome_options = Options()
         chrome_options.add_argument('--no-sandbox')
@@ -79,7 +133,10 @@ class FleetScraper:
         
         # Use local ChromeDriver
         service = Service(executable_path="./chromedriver.exe")
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        self.attach_driver(webdriver.Chrome(service=service, options=chrome_options))
+
+    def attach_driver(self, driver):
+        self.driver = driver
         self.wait = WebDriverWait(self.driver, 30)  # 30 second timeout
 
     def setup_csv(self):
@@ -100,52 +157,103 @@ class FleetScraper:
         except Exception as e:
             print(f"❌ Error saving API response: {str(e)}")
 
+    def setup_cdp_transport(self):
+        """Open a direct DevTools websocket to the browser if enabled"""
+        if not self.use_cdp_transport or (self.cdp and self.cdp.connected):
+            return
+        try:
+            self.cdp = CDPTransport.from_driver(self.driver)
+            self.cdp.connect(self.driver.current_url)
+            self.cdp.watch_responses(self.api_url_fragment)
+            # The job page's rides response loaded before Network.enable on our socket,
+            # so pick it up (and empty chromedriver's buffer) from the performance log once
+            self.primed_response_bodies = list(self.iter_performance_log_bodies())
+        except Exception as e:
+            print(f"❌ Could not set up CDP transport, using chromedriver: {str(e)}")
+            self.close_cdp_transport()
+
+    def close_cdp_transport(self):
+        if self.cdp:
+            self.cdp.close()
+            self.cdp = None
+
+    def evaluate_js(self, expression):
+        """Evaluate a JS expression, over the CDP transport when available"""
+        if self.cdp and self.cdp.connected:
+            try:
+                return self.cdp.evaluate(expression)
+            except CDPError as e:
+                print(f"CDP evaluate failed, falling back to chromedriver: {str(e)}")
+        return self.driver.execute_script(f"return {expression};")
+
+    def iter_api_response_bodies(self):
+        """Yield raw bodies of ride API responses seen since the last call"""
+        if self.cdp and self.cdp.connected:
+            primed, self.primed_response_bodies = self.primed_response_bodies, []
+            yield from primed
+            yield from self.cdp.get_response_bodies()
+            return
+
+        yield from self.iter_performance_log_bodies()
+
+    def discard_performance_log(self):
+        """Empty chromedriver's performance log buffer, which the CDP path doesn't read"""
+        if self.cdp and self.cdp.connected:
+            try:
+                self.driver.get_log("performance")
+            except Exception as e:
+                print(f"Error discarding performance log: {str(e)}")
+
+    def iter_performance_log_bodies(self):
+        """Yield ride API response bodies from chromedriver's performance log"""
+        for log in self.driver.get_log("performance"):
+            try:
+                log_entry = json.loads(log["message"])["message"]
+                
+                # Check if this is a Network.responseReceived event
+                if log_entry["method"] == "Network.responseReceived":
+                    url = log_entry["params"]["response"]["url"]
+                    if self.api_url_fragment in url:
+                        request_id = log_entry["params"]["requestId"]
+                        
+                        # Get response body
+                        response_body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+                        if response_body and "body" in response_body:
+                            yield decode_response_body(response_body)
+            except Exception as e:
+                print(f"Error processing log entry: {str(e)}")
+                continue
+
     def capture_api_response(self):
         """Capture API response from the network logs"""
         try:
-            logs = self.driver.get_log("performance")
             matching_responses = []
             response_index = 1
             
             # First collect all matching responses
-            for log in logs:
+            for body in self.iter_api_response_bodies():
                 try:
-                    log_entry = json.loads(log["message"])["message"]
-                    
-                    # Check if this is a Network.responseReceived event
-                    if "Network.responseReceived" in log_entry["method"]:
-                        url = log_entry["params"]["response"]["url"]
-                        if "mfmyyv2bjh.execute-api.us-east-2.amazonaws.com/prod/sql-templates/run" in url:
-                            request_id = log_entry["params"]["requestId"]
-                            
-                            # Get response body
-                            response_body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
-                            if response_body and "body" in response_body:
-                                try:
-                                    data = json.loads(response_body["body"])
-                                    results = data.get("results", [])
-                                    
-                                    # Check if this is the ride data response
-                                    if results and isinstance(results, list) and len(results) > 0:
-                                        first_item = results[0]
-                                        if all(key in first_item for key in ['ride_id', 'vehicle_class', 'from_name']):
-                                            print(f"\nFound ride data response with {len(results)} jobs")
-                                            # Save only the ride data response
-                                            self.save_api_response(data, response_index)
-                                            response_index += 1
-                                            matching_responses.append(results)
-                                except json.JSONDecodeError:
-                                    continue
-                except Exception as e:
-                    print(f"Error processing log entry: {str(e)}")
+                    data = json.loads(body)
+                except json.JSONDecodeError:
                     continue
+                results = data.get("results", []) if isinstance(data, dict) else []
+                
+                # Check if this is the ride data response
+                if results and isinstance(results, list) and len(results) > 0:
+                    first_item = results[0]
+                    if all(key in first_item for key in ['ride_id', 'vehicle_class', 'from_name']):
+                        print(f"\nFound ride data response with {len(results)} jobs")
+                        # Save only the ride data response
+                        self.save_api_response(data, response_index)
+                        response_index += 1
+                        matching_responses.append(results)
             
-            # Use the response with the most jobs
+            # Use the response with the most jobs, building records only for that one
             if matching_responses:
                 best_response = max(matching_responses, key=len)
-                self.api_data = best_response
+                self.api_data = [RideRecord.from_api(job) for job in best_response]
                 print(f"\nUsing response with {len(best_response)} jobs")
-                return best_response
+                return self.api_data
             
             print("No ride data API responses found")
             return []
@@ -160,94 +268,37 @@ class FleetScraper:
         return self.capture_api_response()
 
     def merge_job_data(self, api_jobs, visual_job_info):
-        """Merge API and visual job data"""
+        """Match a visual job card to its API RideRecord; returns a per-card copy with the card state"""
         try:
-            # Try to match API job with visual job based on location, vehicle type and pickup time
-            for api_job in api_jobs:
-                try:
-                    # Get vehicle type from API job
-                    api_vehicle_type = api_job.get('vehicle_class', {}).get('name')
-                    api_pickup_location = api_job.get('from_name', '')
-                    api_pickup_time = api_job.get('from_time_str', '')
-                    
-                    # Debug matching info
-                    print(f"\nMatching attempt:")
-                    print(f"API Job: {api_vehicle_type} at {api_pickup_time} from {api_pickup_location}")
-                    print(f"Visual Job: {visual_job_info['vehicle_type']} from {visual_job_info['pickup_location']}")
-                    
-                    # Match based on vehicle type and pickup location
-                    if (api_vehicle_type == visual_job_info['vehicle_type'] and
-                        api_pickup_location == visual_job_info['pickup_location']):
-                        
-                        print("✅ Found matching job!")
-                        merged_info = {
-                            'ride_id': str(api_job.get('ride_id', 'N/A')),
-                            'vehicle_type': api_vehicle_type,
-                            'scheduled_pickup_time': api_pickup_time,
-                            'auction_start_time_str': api_job.get('auction_start_time_str', 'N/A'),
-                            'auction_amount': f"{float(api_job.get('auction_amount', 0)):.2f}",
-                            'auction_currency': api_job.get('auction_currency', 'N/A'),
-                            'pickup_location': api_pickup_location,
-                            'dropoff_location': api_job.get('to_name', 'N/A'),
-                            'distance': api_job.get('distance', 'N/A'),
-                            'duration': api_job.get('duration', 'N/A'),
-                            'meet_and_greet': bool(api_job.get('meet_and_greet', 0)),
-                            'has_driver_instruction': bool(api_job.get('has_driver_instruction', 0)),
-                            'can_accept': visual_job_info['can_accept'],
-                            'accept_button': visual_job_info.get('accept_button')
-                        }
-                        return merged_info
-                except Exception as e:
-                    print(f"Error processing individual API job: {str(e)}")
-                    continue
-            
+            # Try to match API job with visual job based on vehicle type and pickup location
+            for ride in api_jobs or []:
+                # Debug matching info
+                print(f"\nMatching attempt:")
+                print(f"API Job: {ride.vehicle_type} at {ride.scheduled_pickup_time} from {ride.pickup_location}")
+                print(f"Visual Job: {visual_job_info['vehicle_type']} from {visual_job_info['pickup_location']}")
+
+                if ride.matches(visual_job_info):
+                    print("✅ Found matching job!")
+                    return ride.for_card(visual_job_info['can_accept'], visual_job_info.get('accept_button'))
+
             print("❌ No matching API job found")
-            # Return visual info with defaults if no API match found
-            return {
-                'ride_id': 'N/A',
-                'vehicle_type': visual_job_info['vehicle_type'],
-                'scheduled_pickup_time': visual_job_info.get('scheduled_pickup_time', 'N/A'),
-                'auction_start_time_str': 'N/A',
-                'auction_amount': '0.00',
-                'auction_currency': 'N/A',
-                'pickup_location': visual_job_info['pickup_location'],
-                'dropoff_location': visual_job_info['dropoff_location'],
-                'distance': 'N/A',
-                'duration': 'N/A',
-                'meet_and_greet': False,
-                'has_driver_instruction': False,
-                'can_accept': visual_job_info['can_accept'],
-                'accept_button': visual_job_info.get('accept_button')
-            }
-            
+            # Build a record from visual info with defaults if no API match found
+            return RideRecord.from_job_card(visual_job_info)
+
         except Exception as e:
             print(f"Error in merge_job_data: {str(e)}")
-            return visual_job_info
+            return RideRecord.from_job_card(visual_job_info)
 
-    def log_job_to_csv(self, job_info, meets_criteria, rejection_reason):
-        """Log job information to CSV file"""
+    def log_job_to_csv(self, ride, meets_criteria, rejection_reason):
+        """Log a RideRecord to the CSV file"""
         try:
             with open(self.csv_file, 'a', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
-                writer.writerow([
+                writer.writerow(ride.to_csv_row(
                     datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    job_info.get('ride_id', 'N/A'),
-                    job_info.get('vehicle_type', 'N/A'),
-                    job_info.get('scheduled_pickup_time', 'N/A'),
-                    job_info.get('auction_start_time_str', 'N/A'),
-                    job_info.get('auction_amount', 'N/A'),
-                    job_info.get('auction_currency', 'N/A'),
-                    job_info.get('pickup_location', 'N/A'),
-                    job_info.get('dropoff_location', 'N/A'),
-                    job_info.get('distance', 'N/A'),
-                    job_info.get('duration', 'N/A'),
-                    job_info.get('meet_and_greet', False),
-                    job_info.get('has_driver_instruction', False),
-                    True,  # is_available (always true since we're logging it)
-                    job_info.get('can_accept', False),
                     meets_criteria,
-                    rejection_reason or 'N/A'
-                ])
+                    rejection_reason
+                ))
         except Exception as e:
             print(f"Error logging to CSV: {str(e)}")
 
@@ -266,13 +317,12 @@ class FleetScraper:
             print(f"Found element: {by}={value}")
             return element
         except TimeoutException:
-            print(f"Timeout waiting for element: {by}={value}")
-            print("Current page source:")
-            print(self.driver.page_source[:1000])
+            print(f"Timeout waiting for element: {by}={value} (url: {self.driver.current_url})")
             raise
 
     def login(self):
         """Log in to the fleet portal"""
+        self.lifecycle.transition(ScraperState.LOGGING_IN)
         try:
             print("\nNavigating to login page...")
             self.driver.get(self.url)
@@ -334,25 +384,23 @@ class FleetScraper:
                     (By.CSS_SELECTOR, "div[class*='--bg-white'][class*='--rounded-lg'][class*='--flex-col']")
                 ))
                 print("Successfully logged in and found job cards!")
+                self.lifecycle.transition(ScraperState.READY)
                 return True
             except TimeoutException:
                 print("Failed to find job cards after login")
+                self.lifecycle.transition(ScraperState.LOGGED_OUT)
                 return False
 
         except Exception as e:
             print(f"\nLogin failed with error: {str(e)}")
-            print("\nFinal page source:")
-            print(self.driver.page_source[:1000])
+            self.lifecycle.transition(ScraperState.LOGGED_OUT)
             return False
 
     def parse_job_card(self, job_card):
         """Extract all relevant information from a job card"""
         try:
             # Get vehicle type
-            vehicle_type = job_card.find_element(
-                By.CSS_SELECTOR, 
-                "div[class*='--text-sm'][class*='--font-bold']"
-            ).text
+            vehicle_type = job_card.find_element(By.CSS_SELECTOR, VEHICLE_TYPE_SELECTOR).text
 
             # Get scheduled pickup time from the specific div
             scheduled_pickup_time = job_card.find_element(
@@ -367,10 +415,7 @@ class FleetScraper:
             ).text
 
             # Get locations
-            locations = job_card.find_elements(
-                By.CSS_SELECTOR,
-                "div[class*='--line-clamp-1'][class*='--text-sm']"
-            )
+            locations = job_card.find_elements(By.CSS_SELECTOR, LOCATION_SELECTOR)
             pickup_location = locations[0].text
             dropoff_location = locations[1].text
 
@@ -397,37 +442,35 @@ class FleetScraper:
                 'can_accept': can_accept,
                 'accept_button': accept_button if can_accept else None
             }
+        except (NoSuchElementException, IndexError) as e:
+            print(f"Error parsing job card: {str(e)}")
+            return None
+        except WebDriverException:
+            # Stale cards and lost sessions are not parse errors; let recovery see them
+            raise
         except Exception as e:
             print(f"Error parsing job card: {str(e)}")
             return None
 
-    def is_acceptable_job(self, job_card, merged_info):
-        """Check if the job meets acceptance criteria"""
+    def is_acceptable_job(self, ride):
+        """Check if the ride meets acceptance criteria"""
         try:
-            job_info = self.parse_job_card(job_card)
-            if not job_info:
-                return False
-
             # Check if job can be accepted
-            if not job_info['can_accept']:
+            if not ride.can_accept:
                 print("❌ Job cannot be accepted (button disabled)")
                 return False
 
-            # Check if auction has started
-            if merged_info and 'auction_start_time_str' in merged_info:
-                try:
-                    auction_start = datetime.strptime(merged_info['auction_start_time_str'], '%Y-%m-%d %H:%M')
-                    current_time = datetime.now()
-                    if current_time < auction_start:
-                        print(f"❌ Auction hasn't started yet. Starts at {auction_start}")
-                        return False
-                except ValueError as e:
-                    print(f"❌ Invalid auction start time format: {merged_info['auction_start_time_str']}")
-                    return False
+            # Check if auction has started (auction_start is None when missing or unparseable)
+            if ride.auction_start is None:
+                print(f"❌ Invalid auction start time format: {ride.auction_start_time}")
+                return False
+            if datetime.now() < ride.auction_start:
+                print(f"❌ Auction hasn't started yet. Starts at {ride.auction_start}")
+                return False
 
             # Check if destination is acceptable (using substring matching)
-            destination = merged_info.get('dropoff_location', '') if merged_info else job_info.get('dropoff_location', '')
-            if not any(acceptable.lower() in destination.lower() for acceptable in self.acceptable_destinations):
+            destination = (ride.dropoff_location or '').lower()
+            if not any(acceptable in destination for acceptable in self.acceptable_destinations_lower):
                 print("❌ Destination not in acceptable list")
                 return False
 
@@ -436,85 +479,181 @@ class FleetScraper:
             print(f"Error checking job acceptance criteria: {str(e)}")
             return False
 
-    def accept_job(self, job_card):
-        """Accept a job that meets the criteria"""
+    def install_accept_helper(self):
+        """Inject the pre-armed accept helper into the current page and future navigations"""
+        if not self.pre_armed_accept:
+            return
+        helper_js = build_accept_helper_js()
         try:
-            # Find the accept button with exact selector
-            accept_button = job_card.find_element(
-                By.CSS_SELECTOR,
-                "div[is='e-tracing'][tracing-name='user_available_accept'][class*='--rounded-lg'][class*='--text-white']"
-            )
-
-            if not accept_button:
-                return False
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": helper_js})
+            self.driver.execute_script(helper_js)
+            print("✅ Installed pre-armed accept helper")
+        except Exception as e:
+            print(f"❌ Could not install accept helper: {str(e)}")
 
-            print("\nAccepting job:")
-            job_info = self.parse_job_card(job_card)
-            print(f"Vehicle: {job_info['vehicle_type']}")
-            print(f"Time: {job_info['pickup_time']}")
-            print(f"From: {job_info['pickup_location']}")
-            print(f"To: {job_info['dropoff_location']}")
-            print(f"Price: {job_info['price']}")
+    def arm_accept_controls(self):
+        """Cache live references to every card's accept control in the page"""
+        try:
+            armed = self.evaluate_js("window.__fleetArm ? window.__fleetArm() : null")
+            if armed is None:
+                # Helper missing (e.g. page replaced without the on-new-document script)
+                self.driver.execute_script(build_accept_helper_js())
+                armed = self.evaluate_js("window.__fleetArm()")
+            print(f"Armed {armed} accept controls")
+        except Exception as e:
+            print(f"Error arming accept controls: {str(e)}")
 
-            # Click the accept button
-            print("Clicking initial accept button...")
-            self.driver.execute_script("arguments[0].click();", accept_button)
+    def accept_job_armed(self, card_index, ride):
+        """Click accept then confirm in a single in-page call. Returns None if the helper can't be used.
 
-            # Wait for and click the confirmation button
-            try:
-                print("Looking for confirmation button...")
-                confirm_button = self.wait_and_find_element(
-                    By.CSS_SELECTOR,
-                    "div[class='--w-full --h-full --absolute --top-0 --left-0']"
+        The armed control is only used while its card still shows this ride;
+        otherwise the ride's own accept button is used (not available over CDP).
+        """
+        timeout_ms = int(self.accept_confirm_timeout * 1000)
+        expected = expected_card(ride)
+        try:
+            print("Accepting via pre-armed helper...")
+            if self.cdp and self.cdp.connected:
+                result = self.cdp.evaluate(
+                    f"window.__fleetAccept({int(card_index)}, {timeout_ms}, null, {json.dumps(expected)})",
+                    timeout=self.accept_confirm_timeout + 5
                 )
-                print("Found confirmation button, clicking...")
-                self.driver.execute_script("arguments[0].click();", confirm_button)
-                
-                # Wait longer for the bid to be processed
-                print("Waiting for bid to be processed...")
-                time.sleep(5)  # Increased wait time
-                
-                # Try to verify if bid was accepted by checking if the job card is still visible
-                try:
-                    job_cards = self.driver.find_elements(
-                        By.CSS_SELECTOR, 
-                        "div[class*='--bg-white'][class*='--rounded-lg'][class*='--flex-col']"
-                    )
-                    if len(job_cards) > 0:
-                        print("⚠️ Job cards still visible - bid may not have been accepted")
-                        return False
-                    else:
-                        print("✅ Job cards no longer visible - bid likely accepted!")
-                        return True
-                except:
-                    print("Could not verify bid status")
-                    return True  # Return True since we clicked both buttons successfully
-                
-            except Exception as e:
-                print(f"Error clicking confirmation button: {str(e)}")
-                return False
+            else:
+                result = self.driver.execute_async_script(
+                    "window.__fleetAccept(arguments[0], arguments[1], arguments[2], arguments[3])"
+                    ".then(arguments[arguments.length - 1]);",
+                    card_index, timeout_ms, ride.accept_button, expected
+                )
+        except Exception as e:
+            print(f"Pre-armed accept failed, falling back: {str(e)}")
+            return None
+
+        if not result:
+            return None
+        if result.get('error') == 'accept control not found':
+            print("Armed accept control not found, falling back")
+            return None
+        if result.get('confirmed'):
+            print(f"Clicked accept and confirm in {result.get('elapsedMs', 0):.1f}ms (in page)")
+            return True
+        print(f"Pre-armed accept did not confirm: {result.get('error')}")
+        return False
+
+    def accept_job_via_cdp(self, card_index, ride):
+        """Click accept and confirm with CDP input events. Returns None if the transport can't be used.
+
+        Cards are located by position, so the card is checked to still show this
+        ride first; earlier cards may have left the list while rides were parsed.
+        """
+        try:
+            print("Clicking initial accept button via CDP...")
+            point = self.cdp.evaluate(build_card_accept_point_js(card_index, ride))
+            if not point:
+                print("Job card no longer matches the ride via CDP")
+                return None
+            self.cdp.click_at(point['x'], point['y'])
+
+            print("Looking for confirmation button via CDP...")
+            deadline = time.time() + 30
+            while time.time() < deadline:
+                if self.cdp.click_selector(CONFIRM_BUTTON_SELECTOR):
+                    print("Clicked confirmation button via CDP")
+                    return True
+                time.sleep(0.05)
+            print("Timeout waiting for confirmation button via CDP")
+            return False
+        except CDPError as e:
+            print(f"CDP accept failed, falling back to chromedriver: {str(e)}")
+            return None
+
+    def accept_job(self, job_card, card_index=None, ride=None):
+        """Accept a job that meets the criteria"""
+        try:
+            clicked = None
+            if self.pre_armed_accept and card_index is not None and ride:
+                clicked = self.accept_job_armed(card_index, ride)
+            if clicked is None and self.cdp and self.cdp.connected and card_index is not None and ride:
+                clicked = self.accept_job_via_cdp(card_index, ride)
+            if clicked is None:
+                clicked = self.click_accept_and_confirm(job_card)
+
+            # Details are printed after the clicks so they don't delay the bid
+            if ride:
+                print("\nAccepting job:")
+                print(f"Vehicle: {ride.vehicle_type}")
+                print(f"Time: {ride.scheduled_pickup_time}")
+                print(f"From: {ride.pickup_location}")
+                print(f"To: {ride.dropoff_location}")
+                print(f"Price: {ride.currency} {ride.auction_amount}")
+
+            return clicked and self.verify_bid_accepted()
 
         except Exception as e:
             print(f"Error accepting job: {str(e)}")
             return False
 
+    def click_accept_and_confirm(self, job_card):
+        """Click accept and then confirm through chromedriver. Returns True if both were clicked."""
+        # Find the accept button with exact selector
+        accept_button = job_card.find_element(By.CSS_SELECTOR, ACCEPT_BUTTON_SELECTOR)
+
+        if not accept_button:
+            return False
+
+        # Click the accept button
+        print("Clicking initial accept button...")
+        self.driver.execute_script("arguments[0].click();", accept_button)
+
+        # Wait for and click the confirmation button
+        try:
+            print("Looking for confirmation button...")
+            confirm_button = self.wait_and_find_element(By.CSS_SELECTOR, CONFIRM_BUTTON_SELECTOR)
+            print("Found confirmation button, clicking...")
+            self.driver.execute_script("arguments[0].click();", confirm_button)
+            return True
+            
+        except Exception as e:
+            print(f"Error clicking confirmation button: {str(e)}")
+            return False
+
+    def verify_bid_accepted(self):
+        """Wait for the bid to be processed and check whether the job cards disappeared"""
+        # Wait longer for the bid to be processed
+        print("Waiting for bid to be processed...")
+        time.sleep(5)  # Increased wait time
+        
+        # Try to verify if bid was accepted by checking if the job card is still visible
+        try:
+            job_cards = self.driver.find_elements(
+                By.CSS_SELECTOR, 
+                "div[class*='--bg-white'][class*='--rounded-lg'][class*='--flex-col']"
+            )
+            if len(job_cards) > 0:
+                print("⚠️ Job cards still visible - bid may not have been accepted")
+                return False
+            else:
+                print("✅ Job cards no longer visible - bid likely accepted!")
+                return True
+        except:
+            print("Could not verify bid status")
+            return True  # Return True since we clicked both buttons successfully
+
     def scroll_to_bottom(self):
         """Scroll down until no more new jobs appear"""
         try:
             print("\nScrolling to load all jobs...")
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
+            last_height = self.evaluate_js("document.body.scrollHeight")
             job_count = 0
             
             while True:
                 # Scroll down
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                self.evaluate_js("window.scrollTo(0, document.body.scrollHeight)")
                 time.sleep(2)  # Wait for content to load
                 
                 # Get current job count
-                current_jobs = len(self.driver.find_elements(
-                    By.CSS_SELECTOR, 
-                    "div[class*='--bg-white'][class*='--rounded-lg'][class*='--flex-col']"
-                ))
+                current_jobs = self.evaluate_js(
+                    "document.querySelectorAll(\"div[class*='--bg-white'][class*='--rounded-lg'][class*='--flex-col']\").length"
+                )
                 
                 # Check if more jobs were loaded
                 if current_jobs > job_count:
@@ -523,7 +662,7 @@ class FleetScraper:
                     continue
                 
                 # Get new height
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
+                new_height = self.evaluate_js("document.body.scrollHeight")
                 
                 # Break if no new content loaded
                 if new_height == last_height:
@@ -537,6 +676,7 @@ class FleetScraper:
 
     def process_jobs(self):
         """Process all available jobs. Returns True if a job was accepted."""
+        self.lifecycle.transition(ScraperState.POLLING)
         try:
             # Scroll to load all jobs first
             self.scroll_to_bottom()
@@ -549,85 +689,99 @@ class FleetScraper:
 
             # Get all loaded job cards
             print("\nLooking for visual job cards...")
-            job_cards = self.wait.until(EC.presence_of_all_elements_located(
-                (By.CSS_SELECTOR, "div[class*='--bg-white'][class*='--rounded-lg'][class*='--flex-col']")
-            ))
+            job_cards = []
+            if self.wait_for_job_cards():
+                job_cards = self.driver.find_elements(By.CSS_SELECTOR, JOB_CARD_SELECTOR)
             
             total_cards = len(job_cards)
             print(f"\nFound {total_cards} visual job cards")
             
             if total_cards == 0:
                 print("No jobs available at the moment")
+                self.lifecycle.transition(ScraperState.READY)
                 return False
             
+            if self.pre_armed_accept:
+                self.arm_accept_controls()
+            
             print("\nAnalyzing all job cards:")
             print("-" * 50)
             
             available_jobs = 0
             rejected_jobs = 0
             rejection_reasons = []
+            stale_cards = 0
             
             for index, job_card in enumerate(job_cards, 1):
                 print(f"\nJob Card {index}/{total_cards}:")
                 
                 # Parse visual job information
-                visual_job_info = self.parse_job_card(job_card)
+                try:
+                    visual_job_info = self.parse_job_card(job_card)
+                except StaleElementReferenceException as e:
+                    # The ride was taken or expired while earlier cards were parsed
+                    print("❌ Job card is no longer on the page")
+                    stale_cards += 1
+                    stale_error = e
+                    continue
                 if not visual_job_info:
                     print("❌ Failed to parse job card")
                     continue
                 
                 # Merge with API data
-                job_info = self.merge_job_data(api_jobs, visual_job_info)
+                ride = self.merge_job_data(api_jobs, visual_job_info)
                 
                 # Print job details
-                print(f"🆔 Ride ID: {job_info.get('ride_id', 'N/A')}")
-                print(f"🚗 Vehicle: {job_info['vehicle_type']}")
-                print(f"📅 Pickup Time: {job_info.get('scheduled_pickup_time', 'N/A')}")
-                print(f"⏰ Auction Start: {job_info.get('auction_start_time_str', 'N/A')}")
-                print(f"💰 Price: {job_info.get('auction_currency', '')} {job_info.get('auction_amount', '')}")
-                print(f"📍 From: {job_info['pickup_location']}")
-                print(f"🎯 To: {job_info['dropoff_location']}")
-                print(f"📏 Distance: {job_info.get('distance', 'N/A')}m")
-                print(f"⏱️ Duration: {job_info.get('duration', 'N/A')}s")
-                print(f"🤝 Meet & Greet: {job_info.get('meet_and_greet', 'N/A')}")
-                print(f"📝 Has Instructions: {job_info.get('has_driver_instruction', 'N/A')}")
-                print(f"🔓 Can Accept: {job_info['can_accept']}")
+                print(f"🆔 Ride ID: {ride.ride_id}")
+                print(f"🚗 Vehicle: {ride.vehicle_type}")
+                print(f"📅 Pickup Time: {ride.scheduled_pickup_time}")
+                print(f"⏰ Auction Start: {ride.auction_start_time}")
+                print(f"💰 Price: {ride.currency} {ride.auction_amount}")
+                print(f"📍 From: {ride.pickup_location}")
+                print(f"🎯 To: {ride.dropoff_location}")
+                print(f"📏 Distance: {'N/A' if ride.distance is None else ride.distance}m")
+                print(f"⏱️ Duration: {'N/A' if ride.duration is None else ride.duration}s")
+                print(f"🤝 Meet & Greet: {ride.meet_and_greet}")
+                print(f"📝 Has Instructions: {ride.has_driver_instruction}")
+                print(f"🔓 Can Accept: {ride.can_accept}")
                 
                 # Check if job meets acceptance criteria
-                if job_info['can_accept']:
+                if ride.can_accept:
                     available_jobs += 1
                     rejection_reason = None
                     
                     # Check if job meets all criteria
-                    if self.is_acceptable_job(job_card, job_info):
+                    if self.is_acceptable_job(ride):
                         # Job meets all criteria
-                        self.log_job_to_csv(job_info, True, None)
+                        self.log_job_to_csv(ride, True, None)
                         print("✅ Job meets all criteria!")
                         
                         # Try to accept the job
                         print("\nAttempting to accept job...")
-                        if self.accept_job(job_card):
+                        self.lifecycle.transition(ScraperState.ACCEPTING)
+                        if self.accept_job(job_card, index - 1, ride):
                             print("🎉 Successfully accepted the job!")
+                            self.lifecycle.transition(ScraperState.READY)
                             return True
                         else:
                             print("❌ Failed to accept job, trying next one")
+                            self.lifecycle.transition(ScraperState.POLLING)
                             rejection_reason = "Failed to accept job"
                     else:
                         rejection_reason = "Does not meet acceptance criteria"
                     
                     if rejection_reason:
                         rejected_jobs += 1
-                        rejection_reasons.append({
-                            'ride_id': job_info.get('ride_id', 'N/A'),
-                            'vehicle': job_info['vehicle_type'],
-                            'from': job_info['pickup_location'],
-                            'to': job_info['dropoff_location'],
-                            'reason': rejection_reason
-                        })
-                        self.log_job_to_csv(job_info, False, rejection_reason)
+                        rejection_reasons.append((ride, rejection_reason))
+                        self.log_job_to_csv(ride, False, rejection_reason)
                 else:
                     print("❌ Cannot accept this job")
-                    self.log_job_to_csv(job_info, False, "Cannot accept")
+                    self.log_job_to_csv(ride, False, "Cannot accept")
+            
+            if stale_cards == total_cards:
+                # Every card went stale: the list was re-rendered, not just a ride taken
+                self.lifecycle.report_failure(stale_error)
+                return False
             
             print("\n" + "-" * 50)
             print(f"Summary:")
@@ -636,15 +790,17 @@ class FleetScraper:
             print(f"Rejected: {rejected_jobs}")
             if rejected_jobs > 0:
                 print("\nRejected jobs:")
-                for job in rejection_reasons:
-                    print(f"- Ride {job['ride_id']} ({job['vehicle']}) from {job['from']} to {job['to']}")
-                    print(f"  Reason: {job['reason']}")
+                for ride, reason in rejection_reasons:
+                    print(f"- Ride {ride.ride_id} ({ride.vehicle_type}) from {ride.pickup_location} to {ride.dropoff_location}")
+                    print(f"  Reason: {reason}")
             print("-" * 50)
             
+            self.lifecycle.transition(ScraperState.READY)
             return False
 
         except Exception as e:
             print(f"Error processing jobs: {str(e)}")
+            self.lifecycle.report_failure(e)
             return False
 
     def click_reload_button(self):
@@ -676,7 +832,9 @@ class FleetScraper:
             return False
 
     def refresh_page(self):
-        """Refresh the page either using button or browser refresh"""
+        """Refresh the page either using button or browser refresh. Returns True on success."""
+        # A fresh page fetches fresh ride data
+        self.api_data = None
         try:
             if self.use_reload_button:
                 success = self.click_reload_button()
@@ -688,25 +846,126 @@ class FleetScraper:
             
             # Wait for page to load after refresh
             print("Waiting for page to load after refresh...")
-            self.wait.until(EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "div[class*='--bg-white'][class*='--rounded-lg'][class*='--flex-col']")
-            ))
-            print("Page refreshed successfully")
+            if self.wait_for_job_cards():
+                print("Page refreshed successfully")
+            else:
+                print("Page refreshed successfully (no jobs listed)")
+            return True
             
         except Exception as e:
             print(f"Error during refresh: {str(e)}")
-            print("Attempting to recover...")
+            self.lifecycle.report_failure(e)
+            return False
+
+    def wait_for_job_cards(self, timeout=None):
+        """Wait for job cards to appear.
+
+        Returns True if cards are present and False if none appeared but the page is
+        healthy (no jobs listed). Raises TimeoutException if the page is not healthy.
+        """
+        try:
+            WebDriverWait(self.driver, timeout or self.job_card_timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, JOB_CARD_SELECTOR))
+            )
+            return True
+        except TimeoutException:
+            # An empty list on a healthy page is not a failure
+            if self.probe_page():
+                return False
+            raise
+
+    def probe_page(self):
+        """Quick health check: page loaded and still logged in (no login form)"""
+        try:
+            if self.evaluate_js("document.readyState") != "complete":
+                return False
+            login_form = self.driver.find_elements(By.CSS_SELECTOR, "input[ref='emailInput']")
+            return not login_form
+        except Exception as e:
+            print(f"Page probe failed: {str(e)}")
+            return False
+
+    def soft_reload(self):
+        """Browser refresh, then wait for job cards or a healthy empty page"""
+        self.api_data = None
+        self.driver.refresh()
+        try:
+            self.wait_for_job_cards()
+            return True
+        except TimeoutException:
+            return False
+
+    def restart_browser(self):
+        """Quit the browser, launch a new one and log in again"""
+        self.close_cdp_transport()
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.api_data = None
+        self.start_browser()
+        self.lifecycle.transition(ScraperState.LOGGED_OUT)
+        if not self.login():
+            return False
+        self.setup_cdp_transport()
+        self.install_accept_helper()
+        return True
+
+    def relogin(self):
+        self.lifecycle.transition(ScraperState.LOGGED_OUT)
+        if not self.login():
+            return False
+        if self.cdp and not self.cdp.connected:
+            self.close_cdp_transport()
+            self.setup_cdp_transport()
+        return True
+
+    def recover(self):
+        """Run recovery for the open incident with bounded exponential backoff.
+
+        Returns True once a strategy succeeds, False if all attempts fail.
+        """
+        incident = self.lifecycle.current_incident
+        if incident is None:
+            return True
+
+        strategies = {
+            FailureClass.RE_PROBE: self.probe_page,
+            FailureClass.SOFT_RELOAD: self.soft_reload,
+            FailureClass.RE_LOGIN: self.relogin,
+            FailureClass.BROWSER_RESTART: self.restart_browser,
+        }
+        for attempt, strategy in enumerate(self.lifecycle.strategies(incident)):
+            delay = self.lifecycle.backoff(attempt)
+            if delay:
+                print(f"Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+            incident.attempts += 1
+            print(f"Recovery attempt {incident.attempts}: {strategy.value}")
             try:
-                self.driver.refresh()
-                time.sleep(5)  # Give extra time for recovery
-            except:
-                print("Could not recover from refresh error")
+                ok = strategies[strategy]()
+            except Exception as e:
+                print(f"Recovery via {strategy.value} failed: {str(e)}")
+                ok = False
+            if ok:
+                self.lifecycle.resolve(strategy)
+                return True
+            if self.lifecycle.state != ScraperState.DEGRADED:
+                self.lifecycle.transition(ScraperState.DEGRADED)
+
+        print("❌ Could not recover, will retry on next cycle")
+        return False
 
     def run(self):
         """Main execution method"""
         try:
             if not self.login():
-                return
+                self.lifecycle.report_failure("Initial login failed", FailureClass.RE_LOGIN)
+                if not self.recover():
+                    return
+
+            self.setup_cdp_transport()
+            self.install_accept_helper()
 
             if self.monitoring_mode:
                 print("\nStarting monitoring session...")
@@ -721,15 +980,25 @@ class FleetScraper:
                     remaining_time = int(end_time - time.time())
                     print(f"\nTime remaining: {remaining_time} seconds")
                     
+                    if self.lifecycle.state == ScraperState.DEGRADED:
+                        # Recover straight away instead of waiting out the refresh interval
+                        if not self.recover():
+                            time.sleep(min(self.refresh_interval, max(0, int(end_time - time.time()))))
+                            continue
+                    
                     print("\nChecking for jobs...")
                     if self.process_jobs():
                         print("✅ Successfully accepted a job! Ending session...")
                         break
+                    if self.lifecycle.state == ScraperState.DEGRADED:
+                        continue
                     
                     if time.time() < end_time:
                         next_refresh = min(self.refresh_interval, remaining_time)
                         if next_refresh > 0:
                             print(f"\nWaiting {next_refresh} seconds before next refresh...")
+                            # Done while idle so it stays off the poll/accept path
+                            self.discard_performance_log()
                             time.sleep(next_refresh)
                             print("\nRefreshing page...")
                             self.refresh_page()
@@ -737,13 +1006,19 @@ class FleetScraper:
                 print("\nMonitoring session completed!")
             else:
                 print("\nStarting single job check...")
-                if self.process_jobs():
+                accepted = self.process_jobs()
+                if not accepted and self.lifecycle.state == ScraperState.DEGRADED and self.recover():
+                    accepted = self.process_jobs()
+                if accepted:
                     print("✅ Successfully accepted a job!")
                 print("\nCheck completed!")
 
         except Exception as e:
             print(f"\nError in main loop: {str(e)}")
         finally:
+            print("\nRecovery summary:")
+            self.lifecycle.summary()
+            self.close_cdp_transport()
             print("\nClosing browser...")
             self.driver.quit()
 
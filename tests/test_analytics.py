@@ -0,0 +1,123 @@
+import csv
+import json
+
+from analytics import Aggregates, run_analysis
+from rides import RideRecord
+
+HEADERS = [
+    'timestamp', 'ride_id', 'vehicle_type', 'scheduled_pickup_time', 'auction_start_time',
+    'auction_amount', 'auction_currency', 'pickup_location', 'dropoff_location', 'distance',
+    'duration', 'meet_and_greet', 'has_driver_instruction', 'is_available', 'can_accept',
+    'meets_criteria', 'rejection_reason',
+]
+
+
+def make_ride(ride_id, amount_cents=6000, dropoff='Genting'):
+    return RideRecord(ride_id=ride_id, vehicle_type='Sedan', amount_cents=amount_cents,
+                      currency='MYR', pickup_location='KLIA', dropoff_location=dropoff)
+
+
+def history_row(timestamp, ride_id, meets_criteria=False, rejection_reason='N/A'):
+    return make_ride(ride_id).to_csv_row(timestamp, meets_criteria, rejection_reason)
+
+
+def write_history(path, rows, mode='w'):
+    with open(path, mode, newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if mode == 'w':
+            writer.writerow(HEADERS)
+        writer.writerows(rows)
+
+
+def write_response(path, ride_ids):
+    results = [{'ride_id': ride_id, 'vehicle_class': {'name': 'Sedan'}, 'auction_amount': '60.00',
+                'auction_currency': 'MYR', 'from_name': 'KLIA', 'to_name': 'Genting'}
+               for ride_id in ride_ids]
+    path.write_text(json.dumps({'results': results}), encoding='utf-8')
+
+
+def test_merge_counts_distinct_rides_per_cell():
+    first = Aggregates()
+    first.add('2025-05-24 13:00:00', make_ride('1'), 'Genting')
+    first.add('2025-05-24 13:05:00', make_ride('1'), 'Genting')
+    second = Aggregates()
+    second.add('2025-05-24 13:10:00', make_ride('1', amount_cents=6500), 'Genting')
+    second.add('2025-05-24 13:10:00', make_ride('2'), 'Genting')
+
+    merged = Aggregates().merge(first).merge(second)
+    assert merged.rows == 4
+    assert merged.seen == {'Genting': {'13': {'1', '2'}}}
+    # Latest sighting wins for the price, first sighting is kept
+    assert merged.rides['1'] == ['2025-05-24 13:00:00', '2025-05-24 13:10:00', 'Sedan', 6500, 'MYR']
+
+
+def test_failed_accept_is_not_counted_as_accepted():
+    aggregates = Aggregates()
+    aggregates.add('2025-05-24 13:40:06', make_ride('4789612'), 'Genting', met_criteria=True)
+    aggregates.add('2025-05-24 13:40:07', make_ride('4789612'), 'Genting',
+                   rejection_reason='Failed to accept job')
+    assert aggregates.accepted() == {}
+
+
+def test_retry_after_failed_accept_counts_once():
+    first = Aggregates()
+    first.add('2025-05-25 12:04:03', make_ride('4792417'), 'Genting', met_criteria=True)
+    first.add('2025-05-25 12:04:34', make_ride('4792417'), 'Genting',
+              rejection_reason='Failed to accept job')
+    second = Aggregates()
+    second.add('2025-05-25 13:08:18', make_ride('4792417'), 'Genting', met_criteria=True)
+
+    merged = Aggregates().merge(first).merge(second)
+    assert merged.accepted() == {'Genting': {'13': 1}}
+    assert merged.rejections == {'Failed to accept job': {'4792417'}}
+
+
+def test_rows_without_ride_id_are_counted_separately():
+    aggregates = Aggregates()
+    aggregates.add('2025-05-24 13:00:00', make_ride('N/A'), 'Genting', rejection_reason='Cannot accept')
+    assert aggregates.rows == 1
+    assert aggregates.unidentified == 1
+    assert aggregates.seen == {}
+    assert aggregates.rides == {}
+
+
+def test_dict_round_trip_survives_json():
+    aggregates = Aggregates()
+    aggregates.add('2025-05-24 13:40:06', make_ride('1'), 'Genting', met_criteria=True)
+    aggregates.add('2025-05-24 13:41:00', make_ride('2'), 'Melaka', rejection_reason='Cannot accept')
+
+    restored = Aggregates.from_dict(json.loads(json.dumps(aggregates.to_dict())))
+    assert restored.to_dict() == aggregates.to_dict()
+    assert restored.seen == aggregates.seen
+    assert restored.rejections == aggregates.rejections
+    assert restored.accepted() == {'Genting': {'13': 1}}
+
+
+def test_history_and_response_of_same_poll_count_once(tmp_path):
+    history = tmp_path / 'job_history.csv'
+    write_history(history, [history_row('2025-05-24 13:29:14', '4755059',
+                                        rejection_reason='Does not meet acceptance criteria')])
+    response = tmp_path / 'api_response_20250524_132914_0.json'
+    write_response(response, ['4755059'])
+
+    aggregates = run_analysis([str(history)], [str(response)], cache_dir=str(tmp_path / 'cache'),
+                              workers=1, destinations=['Genting'])
+    assert aggregates.seen == {'Genting': {'13': {'4755059'}}}
+    assert aggregates.accepted() == {}
+
+
+def test_rerun_resumes_appended_history_from_cache(tmp_path, capsys):
+    history = tmp_path / 'job_history.csv'
+    cache_dir = str(tmp_path / 'cache')
+    write_history(history, [history_row('2025-05-24 13:29:14', '1')])
+    run_analysis([str(history)], [], cache_dir=cache_dir, workers=1)
+
+    write_history(history, [history_row('2025-05-24 14:01:00', '2', meets_criteria=True)], mode='a')
+    aggregates = run_analysis([str(history)], [], cache_dir=cache_dir, workers=1)
+    assert '1 resumed' in capsys.readouterr().out
+    assert aggregates.rows == 2
+    assert aggregates.accepted() == {'Genting': {'14': 1}}
+
+    aggregates = run_analysis([str(history)], [], cache_dir=cache_dir, workers=1)
+    assert '1 from cache' in capsys.readouterr().out
+    assert aggregates.rows == 2
@@ -0,0 +1,199 @@
+import base64
+import io
+import json
+import queue
+import types
+
+import pytest
+
+import cdp_transport
+from cdp_transport import CDPError, CDPTransport, decode_response_body
+
+CLOSED = object()
+
+
+class FakeWebSocket:
+    """In-memory stand-in for a websocket-client connection.
+
+    `respond(message)` returns the replies for one sent command (a list of
+    message dicts); by default every command succeeds with an empty result.
+    """
+
+    def __init__(self, respond=None):
+        self.respond = respond or (lambda message: [{'id': message['id'], 'result': {}}])
+        self.sent = []
+        self.incoming = queue.Queue()
+
+    def settimeout(self, timeout):
+        pass
+
+    def send(self, raw):
+        message = json.loads(raw)
+        self.sent.append(message)
+        for reply in self.respond(message):
+            self.push(reply)
+
+    def push(self, message):
+        self.incoming.put(json.dumps(message))
+
+    def recv(self):
+        raw = self.incoming.get(timeout=5)
+        if raw is CLOSED:
+            raise ConnectionError("socket closed")
+        return raw
+
+    def close(self):
+        self.incoming.put(CLOSED)
+
+
+def connect(monkeypatch, ws, targets=None, current_url=None, **kwargs):
+    targets = targets or [{'type': 'page', 'url': 'https://fleet/', 'webSocketDebuggerUrl': 'ws://page'}]
+    opened = []
+
+    def urlopen(url, timeout):
+        return io.BytesIO(json.dumps(targets).encode('utf-8'))
+
+    def create_connection(url, timeout, suppress_origin):
+        opened.append((url, suppress_origin))
+        return ws
+
+    monkeypatch.setattr(cdp_transport.urllib.request, 'urlopen', urlopen)
+    monkeypatch.setattr(cdp_transport, 'websocket', types.SimpleNamespace(create_connection=create_connection))
+    transport = CDPTransport('127.0.0.1:9222', **kwargs)
+    transport.connect(current_url)
+    return transport, opened
+
+
+def response_received(request_id, url):
+    return {'method': 'Network.responseReceived', 'params': {'requestId': request_id, 'response': {'url': url}}}
+
+
+def test_connect_prefers_current_url_and_suppresses_origin(monkeypatch):
+    targets = [
+        {'type': 'service_worker', 'url': 'https://fleet/sw.js', 'webSocketDebuggerUrl': 'ws://sw'},
+        {'type': 'page', 'url': 'about:blank', 'webSocketDebuggerUrl': 'ws://blank'},
+        {'type': 'page', 'url': 'https://fleet/', 'webSocketDebuggerUrl': 'ws://fleet'},
+    ]
+    transport, opened = connect(monkeypatch, FakeWebSocket(), targets, current_url='https://fleet/')
+    assert opened == [('ws://fleet', True)]
+    assert transport.connected
+    transport.close()
+    assert not transport.connected
+
+
+def test_from_driver_requires_debugger_address():
+    driver = types.SimpleNamespace(capabilities={'goog:chromeOptions': {'debuggerAddress': 'localhost:9222'}})
+    assert CDPTransport.from_driver(driver).debugger_address == 'localhost:9222'
+    with pytest.raises(CDPError):
+        CDPTransport.from_driver(types.SimpleNamespace(capabilities={}))
+
+
+def test_call_resolves_results_and_maps_errors(monkeypatch):
+    def respond(message):
+        if message['method'] == 'Page.bogus':
+            return [{'id': message['id'], 'error': {'code': -32601, 'message': "'Page.bogus' wasn't found"}}]
+        return [{'id': message['id'], 'result': {'echo': message['params']}}]
+
+    transport, _ = connect(monkeypatch, FakeWebSocket(respond))
+    assert transport.call('Runtime.enable', {'a': 1}) == {'echo': {'a': 1}}
+    with pytest.raises(CDPError, match="wasn't found"):
+        transport.call('Page.bogus')
+    transport.close()
+
+
+def test_close_fails_pending_commands(monkeypatch):
+    transport, _ = connect(monkeypatch, FakeWebSocket(lambda message: []))
+    future = transport.send('Runtime.evaluate')
+    transport.close()
+    with pytest.raises(CDPError, match="closed"):
+        transport.wait(future)
+    with pytest.raises(CDPError, match="not connected"):
+        transport.send('Runtime.evaluate')
+
+
+def test_lost_socket_fails_pending_commands(monkeypatch):
+    ws = FakeWebSocket(lambda message: [])
+    transport, _ = connect(monkeypatch, ws)
+    future = transport.send('Runtime.evaluate')
+    ws.close()
+    with pytest.raises(CDPError):
+        transport.wait(future, timeout=5)
+    assert not transport.connected
+
+
+def test_wait_times_out(monkeypatch):
+    transport, _ = connect(monkeypatch, FakeWebSocket(lambda message: []), timeout=0.05)
+    with pytest.raises(CDPError, match="Timed out"):
+        transport.call('Runtime.evaluate')
+    transport.close()
+
+
+def test_response_bodies_are_filtered_pipelined_and_decoded(monkeypatch):
+    bodies = {
+        'r1': {'body': '{"results": [1]}', 'base64Encoded': False},
+        'r3': {'body': base64.b64encode(b'{"results": [3]}').decode('ascii'), 'base64Encoded': True},
+    }
+    held = []
+
+    def respond(message):
+        if message['method'] != 'Network.getResponseBody':
+            return [{'id': message['id'], 'result': {}}]
+        # Only reply once both requests are in flight, so a non-pipelined client times out
+        held.append(message)
+        if len(held) < len(bodies):
+            return []
+        return [{'id': held_message['id'], 'result': bodies[held_message['params']['requestId']]}
+                for held_message in held]
+
+    ws = FakeWebSocket(respond)
+    transport, _ = connect(monkeypatch, ws, timeout=1)
+    transport.watch_responses('/sql-templates/run')
+    ws.push(response_received('r1', 'https://api/prod/sql-templates/run'))
+    ws.push(response_received('r2', 'https://cdn/app.js'))
+    ws.push(response_received('r3', 'https://api/prod/sql-templates/run?page=2'))
+    transport.call('Runtime.enable')  # replies are read in order, so the events are buffered now
+
+    assert transport.get_response_bodies() == ['{"results": [1]}', '{"results": [3]}']
+    assert [m['params']['requestId'] for m in ws.sent if m['method'] == 'Network.getResponseBody'] == ['r1', 'r3']
+    assert transport.get_response_bodies() == []
+    transport.close()
+
+
+def test_decode_response_body():
+    assert decode_response_body({'body': 'plain'}) == 'plain'
+    assert decode_response_body({'body': base64.b64encode('é'.encode('utf-8')).decode(), 'base64Encoded': True}) == 'é'
+    assert decode_response_body({}) == ''
+
+
+def test_evaluate_returns_value_and_raises_on_exception(monkeypatch):
+    def respond(message):
+        if message['params']['expression'] == 'boom()':
+            return [{'id': message['id'], 'result': {
+                'result': {'type': 'object'},
+                'exceptionDetails': {'text': 'Uncaught', 'exception': {'description': 'ReferenceError: boom is not defined'}},
+            }}]
+        return [{'id': message['id'], 'result': {'result': {'type': 'number', 'value': 3}}}]
+
+    ws = FakeWebSocket(respond)
+    transport, _ = connect(monkeypatch, ws)
+    assert transport.evaluate('1 + 2') == 3
+    assert ws.sent[-1]['params'] == {'expression': '1 + 2', 'returnByValue': True, 'awaitPromise': True}
+    with pytest.raises(CDPError, match="ReferenceError"):
+        transport.evaluate('boom()')
+    transport.close()
+
+
+def test_click_selector_dispatches_press_and_release(monkeypatch):
+    def respond(message):
+        if message['method'] == 'Runtime.evaluate':
+            value = None if '[1]' in message['params']['expression'] else {'x': 10, 'y': 20}
+            return [{'id': message['id'], 'result': {'result': {'value': value}}}]
+        return [{'id': message['id'], 'result': {}}]
+
+    ws = FakeWebSocket(respond)
+    transport, _ = connect(monkeypatch, ws)
+    assert transport.click_selector('div.accept') is True
+    clicks = [m['params'] for m in ws.sent if m['method'] == 'Input.dispatchMouseEvent']
+    assert [(c['type'], c['x'], c['y']) for c in clicks] == [('mousePressed', 10, 20), ('mouseReleased', 10, 20)]
+    assert transport.click_selector('div.accept', index=1) is False
+    transport.close()
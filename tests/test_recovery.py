@@ -0,0 +1,80 @@
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from recovery import FailureClass, LifecycleStateMachine, ScraperState, classify_failure
+
+
+def polling_machine(**kwargs):
+    machine = LifecycleStateMachine(**kwargs)
+    for state in (ScraperState.LOGGING_IN, ScraperState.READY, ScraperState.POLLING):
+        machine.transition(state)
+    return machine
+
+
+def test_classify_failure():
+    assert classify_failure(TimeoutException()) is FailureClass.RE_PROBE
+    assert classify_failure(StaleElementReferenceException()) is FailureClass.SOFT_RELOAD
+    assert classify_failure(InvalidSessionIdException()) is FailureClass.BROWSER_RESTART
+    assert classify_failure(WebDriverException("chrome not reachable")) is FailureClass.BROWSER_RESTART
+    assert classify_failure(ValueError("boom")) is FailureClass.SOFT_RELOAD
+
+
+def test_transitions_follow_lifecycle():
+    machine = polling_machine()
+    assert machine.state is ScraperState.POLLING
+    machine.transition(ScraperState.ACCEPTING)
+    machine.transition(ScraperState.READY)
+    assert machine.state is ScraperState.READY
+
+
+def test_unexpected_transition_is_applied_with_warning(capsys):
+    machine = LifecycleStateMachine()
+    machine.transition(ScraperState.ACCEPTING)
+    assert machine.state is ScraperState.ACCEPTING
+    assert "Unexpected state transition" in capsys.readouterr().out
+
+
+def test_backoff_is_exponential_and_bounded():
+    machine = LifecycleStateMachine(backoff_base=0.5, backoff_max=4)
+    assert [machine.backoff(attempt) for attempt in range(7)] == [0, 0.5, 1, 2, 4, 4, 4]
+
+
+def test_strategies_escalate_from_failure_class():
+    machine = polling_machine(max_attempts=5)
+    incident = machine.report_failure(TimeoutException())
+    assert machine.strategies(incident) == [
+        FailureClass.RE_PROBE,
+        FailureClass.SOFT_RELOAD,
+        FailureClass.RE_LOGIN,
+        FailureClass.BROWSER_RESTART,
+        FailureClass.BROWSER_RESTART,
+    ]
+
+
+def test_report_failure_opens_one_incident_and_escalates():
+    machine = polling_machine()
+    incident = machine.report_failure(TimeoutException())
+    assert machine.state is ScraperState.DEGRADED
+    assert machine.report_failure(InvalidSessionIdException()) is incident
+    assert incident.failure_class is FailureClass.BROWSER_RESTART
+    # A milder failure doesn't downgrade the open incident
+    machine.report_failure(TimeoutException())
+    assert incident.failure_class is FailureClass.BROWSER_RESTART
+    assert machine.incidents == [incident]
+
+
+def test_resolve_records_time_to_recover():
+    machine = polling_machine()
+    incident = machine.report_failure(TimeoutException())
+    incident.attempts = 2
+    assert machine.resolve(FailureClass.SOFT_RELOAD) is incident
+    assert incident.recovered
+    assert incident.strategy is FailureClass.SOFT_RELOAD
+    assert incident.time_to_recover >= 0
+    assert machine.state is ScraperState.READY
+    assert machine.current_incident is None
+    assert machine.resolve(FailureClass.RE_PROBE) is None
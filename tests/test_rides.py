@@ -0,0 +1,81 @@
+import csv
+import os
+from datetime import datetime
+
+from rides import RideRecord
+
+# API rows, a card-only row with N/A fields, an accept attempt and its failure, a disabled card
+HISTORY_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'job_history.csv')
+
+API_JOB = {
+    'ride_id': 4755059,
+    'vehicle_class': {'name': 'Comfort Sedan'},
+    'from_time_str': '2025-05-24 14:45',
+    'auction_start_time_str': '2025-05-24 00:00',
+    'auction_amount': '75.5',
+    'auction_currency': 'MYR',
+    'from_name': 'Kuala Lumpur International Airport',
+    'to_name': 'Genting Highlands',
+    'distance': 73668,
+    'duration': 4191,
+    'meet_and_greet': 1,
+}
+
+
+def test_from_api_parses_fields_once():
+    ride = RideRecord.from_api(API_JOB)
+    assert ride.ride_id == '4755059'
+    assert ride.amount_cents == 7550
+    assert ride.auction_amount == '75.50'
+    assert ride.auction_start == datetime(2025, 5, 24, 0, 0)
+    assert ride.scheduled_pickup_time == '2025-05-24 14:45'
+    assert ride.distance == 73668
+    assert ride.meet_and_greet is True
+    assert ride.has_driver_instruction is False
+
+
+def test_strings_are_interned():
+    first = RideRecord.from_api(dict(API_JOB, to_name=''.join(['Genting ', 'Highlands'])))
+    second = RideRecord.from_api(dict(API_JOB, to_name=''.join(['Genting', ' Highlands'])))
+    assert first.dropoff_location is second.dropoff_location
+
+
+def test_invalid_values_fall_back():
+    ride = RideRecord.from_api({'ride_id': 1, 'auction_amount': 'abc', 'distance': None,
+                                'auction_start_time_str': 'soon'})
+    assert ride.amount_cents == 0
+    assert ride.distance is None
+    assert ride.auction_start is None
+    assert ride.auction_start_time == 'N/A'
+
+
+def test_job_card_pickup_time_is_kept():
+    ride = RideRecord.from_job_card({
+        'vehicle_type': 'Sedan',
+        'scheduled_pickup_time': '2025-06-24 12:30 PM',
+        'pickup_location': 'KUL',
+        'dropoff_location': 'Genting',
+        'can_accept': True,
+    })
+    assert ride.scheduled_pickup_time == '2025-06-24 12:30 PM'
+    assert ride.ride_id == 'N/A'
+
+
+def test_history_csv_round_trips():
+    with open(HISTORY_CSV, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))[1:]
+    assert rows
+    for row in rows:
+        ride = RideRecord.from_csv_row(row)
+        rebuilt = ride.to_csv_row(row[0], row[15] == 'True', row[16])
+        assert [str(value) for value in rebuilt] == row
+
+
+def test_card_state_does_not_touch_cached_record():
+    cached = RideRecord.from_api(API_JOB)
+    first = cached.for_card(True, accept_button='button-1')
+    second = cached.for_card(False)
+    assert (first.can_accept, first.accept_button) == (True, 'button-1')
+    assert (second.can_accept, second.accept_button) == (False, None)
+    assert (cached.can_accept, cached.accept_button) == (False, None)
+    assert first.ride_id == cached.ride_id and first.amount_cents == cached.amount_cents
@@ -0,0 +1,134 @@
+import pytest
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+
+from recovery import FailureClass, LifecycleStateMachine, ScraperState
+from scraper import FleetScraper
+
+
+class FakeDriver:
+    def __init__(self, job_cards=()):
+        self.job_cards = list(job_cards)
+
+    def find_elements(self, by, selector):
+        return self.job_cards
+
+
+class FakeElement:
+    def __init__(self, text='Sedan'):
+        self.text = text
+
+    def get_attribute(self, name):
+        return '--rounded-lg bg-[#ddd]'  # disabled accept button
+
+
+class FakeJobCard:
+    """Job card whose lookups all succeed, or all raise error"""
+
+    def __init__(self, error=None):
+        self.error = error
+
+    def find_element(self, by, selector):
+        if self.error:
+            raise self.error
+        return FakeElement()
+
+    def find_elements(self, by, selector):
+        if self.error:
+            raise self.error
+        return [FakeElement('KLIA'), FakeElement('Genting')]
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    lifecycle = LifecycleStateMachine(backoff_base=0, max_attempts=3)
+    scraper = FleetScraper.from_driver(FakeDriver(), lifecycle=lifecycle, csv_file=str(tmp_path / 'history.csv'))
+    for state in (ScraperState.LOGGING_IN, ScraperState.READY, ScraperState.POLLING):
+        lifecycle.transition(state)
+    return scraper
+
+
+def stub_strategies(scraper, results):
+    """Replace the recovery strategies; results maps method name to a return value,
+    an exception to raise or a callable to run. Returns the (name, state) call log."""
+    calls = []
+
+    def strategy(name):
+        def run():
+            calls.append((name, scraper.lifecycle.state))
+            result = results.get(name, False)
+            if isinstance(result, Exception):
+                raise result
+            return result() if callable(result) else result
+        return run
+
+    for name in ('probe_page', 'soft_reload', 'relogin', 'restart_browser'):
+        setattr(scraper, name, strategy(name))
+    return calls
+
+
+def test_recover_without_incident_does_nothing(scraper):
+    calls = stub_strategies(scraper, {})
+    assert scraper.recover() is True
+    assert calls == []
+
+
+def test_recover_escalates_until_a_strategy_succeeds(scraper):
+    calls = stub_strategies(scraper, {'probe_page': RuntimeError('probe crashed'), 'soft_reload': True})
+    incident = scraper.lifecycle.report_failure(TimeoutException())
+
+    assert scraper.recover() is True
+    assert calls == [('probe_page', ScraperState.DEGRADED), ('soft_reload', ScraperState.DEGRADED)]
+    assert incident.attempts == 2
+    assert incident.strategy is FailureClass.SOFT_RELOAD
+    assert incident.recovered
+    assert scraper.lifecycle.current_incident is None
+    assert scraper.lifecycle.state is ScraperState.READY
+
+
+def test_recover_stays_degraded_after_failed_strategy(scraper):
+    def failed_relogin():
+        # Strategies may leave DEGRADED themselves (relogin goes through LOGGED_OUT)
+        scraper.lifecycle.transition(ScraperState.LOGGED_OUT)
+        return False
+
+    calls = stub_strategies(scraper, {'relogin': failed_relogin})
+    incident = scraper.lifecycle.report_failure("Initial login failed", FailureClass.RE_LOGIN)
+
+    assert scraper.recover() is False
+    assert [name for name, _ in calls] == ['relogin', 'restart_browser', 'restart_browser']
+    assert calls[1] == ('restart_browser', ScraperState.DEGRADED)
+    assert incident.attempts == 3
+    assert not incident.recovered
+    assert scraper.lifecycle.state is ScraperState.DEGRADED
+
+
+def run_process_jobs(scraper, job_cards):
+    scraper.driver.job_cards = job_cards
+    scraper.scroll_to_bottom = lambda: None
+    scraper.get_api_data = lambda: []
+    scraper.wait_for_job_cards = lambda: True
+    scraper.lifecycle.transition(ScraperState.READY)
+    return scraper.process_jobs()
+
+
+def test_lost_session_while_parsing_is_reported(scraper):
+    assert run_process_jobs(scraper, [FakeJobCard(InvalidSessionIdException('invalid session id'))]) is False
+    assert scraper.lifecycle.state is ScraperState.DEGRADED
+    assert scraper.lifecycle.current_incident.failure_class is FailureClass.BROWSER_RESTART
+
+
+def test_single_stale_card_is_skipped(scraper):
+    assert run_process_jobs(scraper, [FakeJobCard(StaleElementReferenceException()), FakeJobCard()]) is False
+    assert scraper.lifecycle.state is ScraperState.READY
+    assert scraper.lifecycle.current_incident is None
+
+
+def test_all_cards_stale_is_reported(scraper):
+    cards = [FakeJobCard(StaleElementReferenceException()) for _ in range(2)]
+    assert run_process_jobs(scraper, cards) is False
+    assert scraper.lifecycle.state is ScraperState.DEGRADED
+    assert scraper.lifecycle.current_incident.failure_class is FailureClass.SOFT_RELOAD